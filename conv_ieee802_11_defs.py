@@ -1,21 +1,77 @@
+#!/usr/bin/env python
+
+"""
+generate ieee802_11_ids.py, the tables of the element IDs, the element ID
+extensions, the cipher suites and the AKM suites, from ieee802_11_defs.h.
+run it again when the header is updated.
+"""
+
 import re
 
 # #define WLAN_EID_CF_PARAMS 4
-re_h = re.compile("#define WLAN_EID_([^\s]+)\s+(\d+)")
-
-fmt = """\
-    {{
-        "id": {eid},
-        "name": "{name}",
-        "parser": pr_base,
-    }},
-"""
+re_eid = re.compile(r"#define WLAN_EID_([^\s]+)\s+(\d+)")
+# #define WLAN_CIPHER_SUITE_CCMP		0x000FAC04
+re_suite = re.compile(r"#define WLAN_(CIPHER|AKM)_SUITE_([^\s]+)\s+0x([0-9a-fA-F]+)")
+
+def read_defs(header_file):
+    """
+    returns the dicts of the element IDs, the element ID extensions,
+    the cipher suites and the AKM suites to the names.
+    the WLAN_EID_EXT_* after WLAN_EID_EXTENSION are the extensions,
+    as WLAN_EID_EXT_SUPP_RATES and WLAN_EID_EXT_CAPAB are not.
+    """
+    eids = {}
+    eid_exts = {}
+    suites = {"CIPHER": {}, "AKM": {}}
+    with open(header_file) as fd:
+        for line in fd:
+            if r := re_eid.match(line):
+                name, v = r.group(1), int(r.group(2))
+                if 255 in eids and name.startswith("EXT_"):
+                    eid_exts.setdefault(v, name[4:])
+                else:
+                    eids.setdefault(v, name)
+            elif r := re_suite.match(line):
+                suites[r.group(1)].setdefault(int(r.group(3), 16), r.group(2))
+    return eids, eid_exts, suites["CIPHER"], suites["AKM"]
+
+def fmt_dict(name, d, key_fmt="{}"):
+    lines = [f"{name} = {{"]
+    for k,v in sorted(d.items()):
+        lines.append(f"    {key_fmt.format(k)}: \"{v}\",")
+    lines.append("    }")
+    return "\n".join(lines)
+
+def fmt_table(name, dict_name):
+    return (f"{name} = tuple([{dict_name}.get(_) for _ in range(256)])")
 
-print("element_list = [")
-with open("ieee802_11_defs.h") as fd:
-    for line in fd:
-        if r := re_h.match(line):
-            print(fmt.format(**{"eid":r.group(2), "name":r.group(1)}),
-                  end="")
-print("]")
+def gen_module(header_file):
+    eids, eid_exts, ciphers, akms = read_defs(header_file)
+    return "\n\n".join([
+        f"# generated by conv_ieee802_11_defs.py from {header_file}.\n"
+        "# do not edit.",
+        fmt_dict("eid_names", eids),
+        fmt_dict("eid_ext_names", eid_exts),
+        fmt_dict("cipher_suite_names", ciphers, "0x{:08x}"),
+        fmt_dict("akm_suite_names", akms, "0x{:08x}"),
+        "# the name of each element ID and extension, or None.\n" +
+        fmt_table("eid_table", "eid_names") + "\n" +
+        fmt_table("eid_ext_table", "eid_ext_names"),
+        ]) + "\n"
 
+if __name__ == "__main__":
+    import argparse
+    import sys
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-i", action="store", dest="header_file",
+                    default="ieee802_11_defs.h")
+    ap.add_argument("-o", action="store", dest="output_file",
+                    default="ieee802_11_ids.py",
+                    help="specify the module to be generated, or - for stdout.")
+    opt = ap.parse_args()
+    code = gen_module(opt.header_file)
+    if opt.output_file == "-":
+        sys.stdout.write(code)
+    else:
+        with open(opt.output_file, "w") as fd:
+            fd.write(code)
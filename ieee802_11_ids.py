@@ -0,0 +1,152 @@
+# generated by conv_ieee802_11_defs.py from ieee802_11_defs.h.
+# do not edit.
+
+eid_names = {
+    0: "SSID",
+    1: "SUPP_RATES",
+    2: "FH_PARAMS",
+    3: "DS_PARAMS",
+    4: "CF_PARAMS",
+    5: "TIM",
+    6: "IBSS_PARAMS",
+    7: "COUNTRY",
+    16: "CHALLENGE",
+    32: "PWR_CONSTRAINT",
+    33: "PWR_CAPABILITY",
+    34: "TPC_REQUEST",
+    35: "TPC_REPORT",
+    36: "SUPPORTED_CHANNELS",
+    37: "CHANNEL_SWITCH",
+    38: "MEASURE_REQUEST",
+    39: "MEASURE_REPORT",
+    40: "QUITE",
+    41: "IBSS_DFS",
+    42: "ERP_INFO",
+    45: "HT_CAP",
+    48: "RSN",
+    50: "EXT_SUPP_RATES",
+    54: "MOBILITY_DOMAIN",
+    55: "FAST_BSS_TRANSITION",
+    56: "TIMEOUT_INTERVAL",
+    57: "RIC_DATA",
+    61: "HT_OPERATION",
+    62: "SECONDARY_CHANNEL_OFFSET",
+    68: "WAPI",
+    69: "TIME_ADVERTISEMENT",
+    72: "20_40_BSS_COEXISTENCE",
+    73: "20_40_BSS_INTOLERANT",
+    74: "OVERLAPPING_BSS_SCAN_PARAMS",
+    76: "MMIE",
+    84: "SSID_LIST",
+    90: "BSS_MAX_IDLE_PERIOD",
+    91: "TFS_REQ",
+    92: "TFS_RESP",
+    93: "WNMSLEEP",
+    98: "TIME_ZONE",
+    101: "LINK_ID",
+    107: "INTERWORKING",
+    108: "ADV_PROTO",
+    111: "ROAMING_CONSORTIUM",
+    127: "EXT_CAPAB",
+    156: "CCKM",
+    191: "VHT_CAP",
+    192: "VHT_OPERATION",
+    193: "VHT_EXTENDED_BSS_LOAD",
+    194: "VHT_WIDE_BW_CHSWITCH",
+    195: "VHT_TRANSMIT_POWER_ENVELOPE",
+    196: "VHT_CHANNEL_SWITCH_WRAPPER",
+    197: "VHT_AID",
+    198: "VHT_QUIET_CHANNEL",
+    199: "VHT_OPERATING_MODE_NOTIFICATION",
+    221: "VENDOR_SPECIFIC",
+    255: "EXTENSION",
+    }
+
+eid_ext_names = {
+    1: "ASSOC_DELAY_INFO",
+    2: "FILS_REQ_PARAMS",
+    3: "FILS_KEY_CONFIRM",
+    4: "FILS_SESSION",
+    5: "FILS_HLP_CONTAINER",
+    6: "FILS_IP_ADDR_ASSIGN",
+    7: "KEY_DELIVERY",
+    8: "WRAPPED_DATA",
+    9: "FTM_SYNC_INFO",
+    10: "EXTENDED_REQUEST",
+    11: "ESTIMATED_SERVICE_PARAMS",
+    12: "FILS_PUBLIC_KEY",
+    13: "FILS_NONCE",
+    14: "FUTURE_CHANNEL_GUIDANCE",
+    32: "OWE_DH_PARAM",
+    33: "PASSWORD_IDENTIFIER",
+    35: "HE_CAPABILITIES",
+    36: "HE_OPERATION",
+    38: "HE_MU_EDCA_PARAMS",
+    39: "SPATIAL_REUSE",
+    54: "OCV_OCI",
+    58: "SHORT_SSID_LIST",
+    59: "HE_6GHZ_BAND_CAP",
+    61: "EDMG_CAPABILITIES",
+    62: "EDMG_OPERATION",
+    88: "MSCS_DESCRIPTOR",
+    89: "TCLAS_MASK",
+    92: "REJECTED_GROUPS",
+    93: "ANTI_CLOGGING_TOKEN",
+    100: "PASN_PARAMS",
+    106: "EHT_OPERATION",
+    107: "MULTI_LINK",
+    108: "EHT_CAPABILITIES",
+    109: "TID_TO_LINK_MAPPING",
+    110: "MULTI_LINK_TRAFFIC_INDICATION",
+    }
+
+cipher_suite_names = {
+    0x000fac00: "USE_GROUP",
+    0x000fac01: "WEP40",
+    0x000fac02: "TKIP",
+    0x000fac04: "CCMP",
+    0x000fac05: "WEP104",
+    0x000fac06: "AES_CMAC",
+    0x000fac07: "NO_GROUP_ADDR",
+    0x000fac08: "GCMP",
+    0x000fac09: "GCMP_256",
+    0x000fac0a: "CCMP_256",
+    0x000fac0b: "BIP_GMAC_128",
+    0x000fac0c: "BIP_GMAC_256",
+    0x000fac0d: "BIP_CMAC_256",
+    0x00147201: "SMS4",
+    0x00409600: "CKIP",
+    0x00409601: "CKIP_CMIC",
+    0x00409602: "CMIC",
+    0x004096ff: "KRK",
+    }
+
+akm_suite_names = {
+    0x000fac01: "8021X",
+    0x000fac02: "PSK",
+    0x000fac03: "FT_8021X",
+    0x000fac04: "FT_PSK",
+    0x000fac05: "8021X_SHA256",
+    0x000fac06: "PSK_SHA256",
+    0x000fac07: "TDLS",
+    0x000fac08: "SAE",
+    0x000fac09: "FT_OVER_SAE",
+    0x000fac0a: "AP_PEER_KEY",
+    0x000fac0b: "8021X_SUITE_B",
+    0x000fac0c: "8021X_SUITE_B_192",
+    0x000fac0d: "FT_8021X_SHA384",
+    0x000fac0e: "FILS_SHA256",
+    0x000fac0f: "FILS_SHA384",
+    0x000fac10: "FT_FILS_SHA256",
+    0x000fac11: "FT_FILS_SHA384",
+    0x000fac12: "OWE",
+    0x000fac13: "FT_PSK_SHA384",
+    0x000fac14: "PSK_SHA384",
+    0x000fac18: "SAE_EXT_KEY",
+    0x000fac19: "FT_SAE_EXT_KEY",
+    0x00409600: "CCKM",
+    }
+
+# the name of each element ID and extension, or None.
+eid_table = tuple([eid_names.get(_) for _ in range(256)])
+eid_ext_table = tuple([eid_ext_names.get(_) for _ in range(256)])
@@ -1,4 +1,13 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
+
+# the concrete models of the packets by the set of their fields, so that
+# a packet read back from the output is validated by the same model as
+# it was built.
+packet_models = {}
+
+def register_packet_models(*classes):
+    for cls in classes:
+        packet_models[frozenset(cls.__fields__)] = cls
 
 class Packet(BaseModel):
     _name: str
@@ -6,3 +15,42 @@ class Packet(BaseModel):
     type: str = Field("packet", const=True)
     packet: list[BaseModel]
 
+    @validator("packet", pre=True)
+    def parse_packets(cls, v):
+        """
+        a dict is parsed by the model of which the fields are the same,
+        as BaseModel drops all the fields.
+        """
+        if not isinstance(v, list):
+            return v
+        return [packet_models[frozenset(x)].parse_obj(x)
+                if isinstance(x, dict) and frozenset(x) in packet_models
+                else x for x in v]
+
+
+# the models are built without validation on the hot path.
+# set True to validate every model at construction.
+validate_models = False
+
+# the fields of each model, (name, required, field), in the order of
+# the output, so that the model is built without the walk of construct().
+model_fields = {}
+
+def new_model(cls, **kwargs):
+    if validate_models:
+        return cls(**kwargs)
+    fields = model_fields.get(cls)
+    if fields is None:
+        fields = model_fields[cls] = [(name, f.required, f)
+                                      for name,f in cls.__fields__.items()]
+    values = {}
+    for name,required,f in fields:
+        if name in kwargs:
+            values[name] = kwargs[name]
+        elif not required:
+            values[name] = f.get_default()
+    m = cls.__new__(cls)
+    object.__setattr__(m, "__dict__", values)
+    object.__setattr__(m, "__fields_set__", set(kwargs))
+    m._init_private_attributes()
+    return m
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional, Union
-from packet import Packet
+import struct
+from packet import Packet, new_model, register_packet_models
 
 class ValText(BaseModel):
     Value: int
@@ -26,35 +27,167 @@ class EAP(BaseModel):
     Type: Optional[ValText]
     Data: Optional[str]
 
-def com_int(vs):
-    if isinstance(vs, list):
-        return int("".join(vs), 16)
-    return int(vs, 16)
+class KeyInformation(BaseModel):
+    Value: int
+    Descriptor_Version: int
+    Key_Type: str
+    Install: bool
+    Key_Ack: bool
+    Key_MIC: bool
+    Secure: bool
+    Error: bool
+    Request: bool
+    Encrypted_Key_Data: bool
 
-def com_vt(vs: str, vtmap: dict):
-    v = com_int(vs)
-    t = vtmap.get(v)
-    return ValText(
-            Value=v,
-            Text="UNKNOWN" if t is None else t
-            )
+class KeyDataElement(BaseModel):
+    Type: int
+    Length: int
+    OUI: Optional[str]
+    Data_Type: Optional[ValText]
+    Data: str
+
+class EAPOL_Key(BaseModel):
+    packet_name: str
+    Descriptor_Type: ValText
+    Key_Information: KeyInformation
+    Message: str
+    Key_Length: int
+    Replay_Counter: int
+    Key_Nonce: str
+    Key_IV: str
+    Key_RSC: str
+    Key_ID: str
+    Key_MIC: str
+    Key_Data_Length: int
+    Key_Data: Union[list[KeyDataElement], str]
+
+register_packet_models(EAPOL, EAP, EAPOL_Key)
+
+# the headers are decoded from a memoryview of the frame in bytes.
+# the hex strings are made from the bytes only for the fields output.
+eapol_header = struct.Struct("!BBH")
+eap_header = struct.Struct("!BBH")
+# descriptor type, key information, key length, replay counter, nonce,
+# IV, RSC and ID.  the MIC and the key data length follow.
+eapol_key_header = struct.Struct("!BHHQ32s16s8s8s")
+key_data_length = struct.Struct("!H")
+
+def vt_table(names: dict):
+    """
+    returns a tuple of the ValText for each value of an octet.
+    the instances are made once and shared by all frames.
+    """
+    return tuple([ValText(Value=v, Text=names.get(v, "UNKNOWN"))
+                  for v in range(256)])
+
+eapol_type_vt = vt_table({
+    0: "EAP Packet",
+    1: "Start",
+    2: "Logoff",
+    3: "Key",
+    4: "ASF Alert",
+    })
+
+eap_code_vt = vt_table({
+    1: "Request",
+    2: "Response",
+    3: "Success",
+    4: "Failure",
+    5: "Initiate",
+    6: "Finish",
+    })
+
+# the method types registered by IANA.
+eap_type_vt = vt_table({
+    1: "Identity",
+    2: "Notification",
+    3: "NAK",
+    4: "MD5-Challenge",
+    5: "OTP",
+    6: "GTC",
+    9: "RSA Public Key Authentication",
+    10: "DSS Unilateral",
+    11: "KEA",
+    12: "KEA-VALIDATE",
+    13: "EAP-TLS",
+    14: "Defender Token",
+    15: "RSA SecurID",
+    16: "Arcot Systems",
+    17: "LEAP",
+    18: "EAP-SIM",
+    19: "SRP-SHA1",
+    21: "EAP-TTLS",
+    22: "Remote Access Service",
+    23: "EAP-AKA",
+    24: "EAP-3Com Wireless",
+    25: "EAP-PEAP",
+    26: "MS-EAP-Authentication",
+    27: "MAKE",
+    28: "CRYPTOCard",
+    29: "EAP-MSCHAP-V2",
+    30: "DynamID",
+    31: "Rob EAP",
+    32: "POTP",
+    33: "MS-Authentication-TLV",
+    34: "SentriNET",
+    35: "EAP-Actiontec Wireless",
+    36: "Cogent Systems Biometrics",
+    37: "AirFortress",
+    38: "EAP-HTTP Digest",
+    39: "SecureSuite",
+    40: "DeviceConnect",
+    41: "EAP-SPEKE",
+    42: "EAP-MOBAC",
+    43: "EAP-FAST",
+    44: "ZLXEAP",
+    45: "EAP-Link",
+    46: "EAP-PAX",
+    47: "EAP-PSK",
+    48: "EAP-SAKE",
+    49: "EAP-IKEv2",
+    50: "EAP-AKA'",
+    51: "EAP-GPSK",
+    52: "EAP-pwd",
+    53: "EAP-EKE",
+    54: "PT-EAP",
+    55: "TEAP",
+    56: "EAP-NOOB",
+    254: "Expanded Type",
+    255: "Experimental",
+    })
+
+eapol_key_desc_vt = vt_table({
+    1: "RC4",
+    2: "RSN",
+    254: "WPA",
+    })
+
+kde_type_vt = vt_table({
+    1: "GTK",
+    3: "MAC address",
+    4: "PMKID",
+    6: "Nonce",
+    7: "Lifetime",
+    8: "Error",
+    9: "IGTK",
+    10: "Key ID",
+    11: "Multi-band GTK",
+    12: "Multi-band Key ID",
+    13: "OCI",
+    14: "BIGTK",
+    })
 
 def parse_eapol(data, verbosity=0):
     # EAPOL parser
-    type_map = {
-            0: "EAP Packet",
-            1: "Start",
-            2: "Logoff",
-            3: "Key",
-            4: "ASF Alert",
-            }
-    p = EAPOL(
+    # data: memoryview
+    version, type, length = eapol_header.unpack_from(data)
+    p = new_model(EAPOL,
             packet_name="EAPOL",
-            packet_hexstr=" ".join(data),
-            Version=com_int(data[0]),
-            Type=com_vt(data[1], type_map),
-            Length=com_int(data[2:4]),
-            Body=" ".join(data[4:])
+            packet_hexstr=data.hex(" "),
+            Version=version,
+            Type=eapol_type_vt[type],
+            Length=length,
+            Body=data[4:].hex(" ")
         )
     if verbosity:
         print(f"## EAPOL")
@@ -67,37 +200,22 @@ def parse_eapol(data, verbosity=0):
 
 def parse_eap(data, verbosity=0):
     # EAP parser
-    code_map = {
-            1: "Request",
-            2: "Response",
-            3: "Success",
-            4: "Failure",
-            }
-    type_map = {
-            1: "Identity",
-            2: "Notification",
-            3: "NAK",
-            4: "MD5-Challenge",
-            5: "OTP",
-            6: "GTC",
-            13: "EAP-TLS",
-            21: "EAP-TTLS",
-            25: "EAP-PEAP",
-            }
+    # data: memoryview
     # EAP Header
-    p = EAP(
+    code, identifier, length = eap_header.unpack_from(data)
+    p = new_model(EAP,
             packet_name="EAP",
-            packet_hexstr=" ".join(data),
-            Code=com_vt(data[0], code_map),
-            Identifier=com_int(data[1]),
-            Length=com_int(data[2:4]),
+            packet_hexstr=data.hex(" "),
+            Code=eap_code_vt[code],
+            Identifier=identifier,
+            Length=length,
             )
     if p.Length > 4:
-        p.Type = com_vt(data[4], type_map)
+        p.Type = eap_type_vt[data[4]]
         if p.Type.Text == "Identity":
-            p.Data = "".join([chr(int(i,16)) for i in data[5:]])
+            p.Data = bytes(data[5:]).decode("latin-1")
         else:
-            p.Data = " ".join(data[5:])
+            p.Data = data[5:].hex(" ")
     if verbosity:
         print(f"## EAP")
         print(f"- Code: {p.Code}")
@@ -108,6 +226,114 @@ def parse_eap(data, verbosity=0):
             print(f"- Data: {p.Data}")
     return p
 
+def parse_key_information(v):
+    return new_model(KeyInformation,
+            Value=v,
+            Descriptor_Version=v & 0x0007,
+            Key_Type="Pairwise" if v & 0x0008 else "Group",
+            Install=bool(v & 0x0040),
+            Key_Ack=bool(v & 0x0080),
+            Key_MIC=bool(v & 0x0100),
+            Secure=bool(v & 0x0200),
+            Error=bool(v & 0x0400),
+            Request=bool(v & 0x0800),
+            Encrypted_Key_Data=bool(v & 0x1000),
+            )
+
+def key_message(ki, key_data_len):
+    """
+    returns the message of the handshake guessed from the key information.
+    """
+    if ki.Request:
+        return "Request"
+    if ki.Key_Type == "Group":
+        return "Group 1/2" if ki.Key_Ack else "Group 2/2"
+    if ki.Key_Ack:
+        return "4-Way 3/4" if ki.Install else "4-Way 1/4"
+    if ki.Secure and not key_data_len:
+        return "4-Way 4/4"
+    return "4-Way 2/4"
+
+def parse_key_data(data):
+    """
+    parse the key data into the elements and the KDEs.
+    data: memoryview
+    """
+    elms = []
+    offset = 0
+    while offset + 2 <= len(data):
+        type, length = data[offset], data[offset+1]
+        if type == 0xdd and length == 0:
+            # the padding.
+            break
+        body = data[offset+2:offset+2+length]
+        if type == 0xdd and length >= 4 and body[:3] == b"\x00\x0f\xac":
+            elms.append(new_model(KeyDataElement,
+                    Type=type,
+                    Length=length,
+                    OUI=body[:3].hex(":"),
+                    Data_Type=kde_type_vt[body[3]],
+                    Data=body[4:].hex(" ")))
+        else:
+            elms.append(new_model(KeyDataElement,
+                    Type=type,
+                    Length=length,
+                    Data=body.hex(" ")))
+        offset += 2 + length
+    return elms
+
+def parse_eapol_key(data, verbosity=0):
+    # EAPOL-Key parser
+    # data: memoryview of the body of EAPOL.
+    (desc_type, key_info, key_len, replay, nonce, iv, rsc,
+            key_id) = eapol_key_header.unpack_from(data)
+    # the MIC is 16 octets but for some AKMs, e.g. 24 for Suite B 192.
+    # take the length consistent with the key data length.
+    offset = eapol_key_header.size
+    for mic_len in [16, 24, 32, 0]:
+        end = offset + mic_len + 2
+        if (end <= len(data) and
+                end + key_data_length.unpack_from(data, end - 2)[0] ==
+                len(data)):
+            break
+    else:
+        # a truncated frame.
+        mic_len = min(16, len(data) - offset - 2)
+    mic = data[offset:offset+mic_len]
+    offset += mic_len
+    kd_len, = key_data_length.unpack_from(data, offset)
+    kd = data[offset+2:offset+2+kd_len]
+    ki = parse_key_information(key_info)
+    p = new_model(EAPOL_Key,
+            packet_name="EAPOL-Key",
+            Descriptor_Type=eapol_key_desc_vt[desc_type],
+            Key_Information=ki,
+            Message=key_message(ki, kd_len),
+            Key_Length=key_len,
+            Replay_Counter=replay,
+            Key_Nonce=nonce.hex(" "),
+            Key_IV=iv.hex(" "),
+            Key_RSC=rsc.hex(" "),
+            Key_ID=key_id.hex(" "),
+            Key_MIC=mic.hex(" "),
+            Key_Data_Length=kd_len,
+            Key_Data=(kd.hex(" ") if ki.Encrypted_Key_Data
+                      else parse_key_data(kd)),
+            )
+    if verbosity:
+        print(f"## EAPOL-Key")
+        print(f"- Descriptor Type: {p.Descriptor_Type}")
+        print(f"- Key Information: {p.Key_Information.Value:#06x} "
+              f"({p.Message})")
+        print(f"- Key Length: {p.Key_Length}")
+        print(f"- Replay Counter: {p.Replay_Counter}")
+        print(f"- Key Data Length: {p.Key_Data_Length}")
+        if verbosity > 1:
+            print(f"- Key Nonce: {p.Key_Nonce}")
+            print(f"- Key MIC: {p.Key_MIC}")
+            print(f"- Key Data: {p.Key_Data}")
+    return p
+
 def parse_eapol_hexdump(ts, keys, verbosity=0):
     """
     ts: timestamp, str
@@ -121,9 +347,14 @@ def parse_eapol_hexdump(ts, keys, verbosity=0):
     if verbosity:
         print("===")
         print("#", ts, dir, len)
-    d = payload.split()
-    eapol = parse_eapol(d, verbosity=verbosity)
+    data = memoryview(bytes.fromhex(payload))
+    eapol = parse_eapol(data, verbosity=verbosity)
+    # the bytes after the body, e.g. the padding, are not of the key.
+    body = data[4:4+eapol.Length]
+    if eapol.Type.Value == 3 and body.nbytes >= eapol_key_header.size + 2:
+        key = parse_eapol_key(body, verbosity=verbosity)
+        return new_model(Packet, packet=[ eapol, key ])
     if eapol.Type.Value != 0:
-        return Packet(_name="Frame", _hexstr=payload, packet=[ eapol ])
-    eap = parse_eap(eapol.Body.split(), verbosity=verbosity)
-    return Packet(_name="Frame", _hexstr=payload, packet=[ eapol, eap ])
+        return new_model(Packet, packet=[ eapol ])
+    eap = parse_eap(data[4:], verbosity=verbosity)
+    return new_model(Packet, packet=[ eapol, eap ])
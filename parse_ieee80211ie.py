@@ -1,6 +1,17 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
 from typing import Optional, Union
-from packet import Packet
+from functools import lru_cache
+from array import array
+import struct
+from packet import Packet, new_model, register_packet_models
+from ieee802_11_ids import eid_table, eid_ext_table, cipher_suite_names, \
+        akm_suite_names
+
+def parse_hex(cls, v):
+    """
+    accept the data in hex as output by dict().
+    """
+    return [int(_, 16) for _ in v.split()] if isinstance(v, str) else v
 
 class IE_Base(BaseModel):
     name: str
@@ -8,6 +19,8 @@ class IE_Base(BaseModel):
     length: int
     data: list[int]
 
+    _parse_data = validator("data", pre=True, allow_reuse=True)(parse_hex)
+
     """
     class Config:
         json_encoders = {
@@ -35,10 +48,86 @@ class IE_Country(IE_Base):
 class IE_Vendor_Base(IE_Base):
     vendor: str
 
+class IE_RSN(IE_Base):
+    version: int
+    group_cipher: Optional[str]
+    pairwise_ciphers: list[str]
+    akm_suites: list[str]
+    rsn_capabilities: Optional[int]
+    mfp_capable: Optional[bool]
+    mfp_required: Optional[bool]
+    pmkids: list[str]
+    group_mgmt_cipher: Optional[str]
+
+class IE_HT_Cap(IE_Base):
+    ht_cap_info: int
+    channel_width_40: bool
+    short_gi_20: bool
+    short_gi_40: bool
+    ampdu_params: int
+    rx_mcs: str
+    nss: int
+
+class IE_HT_Operation(IE_Base):
+    primary_channel: int
+    secondary_channel_offset: str
+    sta_channel_width: str
+
+class IE_VHT_Cap(IE_Base):
+    vht_cap_info: int
+    max_mpdu_length: int
+    supported_channel_width_set: int
+    rx_mcs_map: int
+    tx_mcs_map: int
+    nss: int
+
+class IE_VHT_Operation(IE_Base):
+    channel_width: str
+    center_freq_seg0: int
+    center_freq_seg1: int
+    basic_mcs_map: int
+
+class IE_Extension(IE_Base):
+    ext_id: int
+    ext_name: str
+
+class IE_HE_Cap(IE_Extension):
+    mac_cap: str
+    phy_cap: str
+    channel_width_set: int
+    rx_mcs_80: int
+    tx_mcs_80: int
+    nss: int
+
+class IE_HE_Operation(IE_Extension):
+    default_pe_duration: int
+    twt_required: bool
+    bss_color: int
+    bss_color_disabled: bool
+    basic_mcs_nss: int
+    vht_operation: Optional[str]
+    primary_channel_6g: Optional[int]
+    channel_width_6g: Optional[int]
+
+class IE_EHT_Cap(IE_Extension):
+    mac_cap: str
+    phy_cap: str
+    support_320mhz: bool
+
+class IE_EHT_Operation(IE_Extension):
+    basic_mcs_nss: int
+    channel_width: Optional[str]
+    ccfs0: Optional[int]
+    ccfs1: Optional[int]
+    disabled_subchannel_bitmap: Optional[int]
+
 class IE_Vendor_WFA(IE_Vendor_Base):
     voi_type: str
     voi_data: list[int]
 
+    _parse_voi_data = validator("voi_data", pre=True,
+                                allow_reuse=True)(parse_hex)
+
     def dict(self, **kwargs):
         output = super().dict(**kwargs)
         for k,v in output.items():
@@ -46,6 +135,12 @@ class IE_Vendor_WFA(IE_Vendor_Base):
                 output[k] = " ".join([ f"{_:02x}" for _ in self.voi_data])
         return output
 
+register_packet_models(
+        IE_Base, IE_SSID, IE_Country, IE_Vendor_Base, IE_RSN, IE_HT_Cap,
+        IE_HT_Operation, IE_VHT_Cap, IE_VHT_Operation, IE_Extension,
+        IE_HE_Cap, IE_HE_Operation, IE_EHT_Cap, IE_EHT_Operation,
+        IE_Vendor_WFA)
+
 def get_payload(data, offset):
     offset += 1
     length = data[offset]
@@ -68,70 +163,303 @@ oui_list = [
     ([0x00, 0x0c, 0xe7], "MediaTek Inc"),
     ]
 
+# the names above by the OUI in 24 bits, taken before the registry.
+oui_names = {(a << 16) | (b << 8) | c: name for (a,b,c),name in oui_list}
+
+# wpal_oui.OUIRegistry for the other vendors, set by set_oui_registry().
+oui_registry = None
+
+def set_oui_registry(reg):
+    global oui_registry
+    oui_registry = reg
+    decode_ieee80211ie.cache_clear()
+    select_ieee80211ie.cache_clear()
+
+def vendor_name(oui):
+    name = oui_names.get(oui)
+    if name is None and oui_registry is not None:
+        name = oui_registry.lookup(oui)
+    return "Unknown" if name is None else name
+
+def pr_vendor_wfa(hdl, payload, length, v_name):
+    if len(payload) < 4:
+        return None
+    if payload[3] == 0x10:
+        voi_type = "HS2.0 Indication"
+    elif payload[3] == 0x1d:
+        voi_type = "Roaming Consortium Selection"
+    else:
+        voi_type = "Unknown"
+    return new_model(IE_Vendor_WFA,
+            name=f"IE {hdl['name']}", eid=hdl["id"],
+            length=length, data=payload,
+            vendor=v_name,
+            voi_type=voi_type,
+            voi_data=payload[4:])
+
+# the decoders of the subtypes for each OUI.
+# a decoder returns the element, or None for IE_Vendor_Base.
+vendor_decoders = {
+    0x506f9a: pr_vendor_wfa,
+    }
+
 def pr_vendor_specific(hdl, data, offset):
     payload, length, offset = get_payload(data, offset)
-    for oui,v_name in oui_list:
-        if payload[:3] == oui:
-            if oui == [0x50, 0x6f, 0x9a]:
-                if payload[3] == 0x10:
-                    voi_type = "HS2.0 Indication"
-                elif payload[3] == 0x1d:
-                    voi_type = "Roaming Consortium Selection"
-                else:
-                    voi_type = "Unknown"
-                voi_data = payload[4:]
-                return offset, IE_Vendor_WFA(
-                        name=f"IE {hdl['name']}", eid=hdl["id"],
-                        length=length, data=payload,
-                        vendor=v_name,
-                        voi_type=voi_type,
-                        voi_data=voi_data)
-            else:
-                voi_data = payload[3:]
-                break
-    else:
-        voi_data = payload[3:]
+    if len(payload) < 3:
         v_name = "Unknown"
-    return offset, IE_Vendor_Base(
+    else:
+        oui = (payload[0] << 16) | (payload[1] << 8) | payload[2]
+        v_name = vendor_name(oui)
+        dec = vendor_decoders.get(oui)
+        if dec is not None:
+            elm = dec(hdl, payload, length, v_name)
+            if elm is not None:
+                return offset, elm
+    return offset, new_model(IE_Vendor_Base,
             name=f"IE {hdl['name']}", eid=hdl["id"],
             length=length, data=payload,
-            vendor=v_name,
-            voi_data=voi_data)
+            vendor=v_name)
 
 def pr_roaming_consortium(hdl, data, offset):
     payload, length, offset = get_payload(data, offset)
     #print("xxx", [hex(i) for i in payload])
-    return offset, IE_Base(name=f"IE {hdl['name']}", eid=hdl["id"],
-                          length=length, data=payload)
+    return offset, new_model(IE_Base,
+                             name=f"IE {hdl['name']}", eid=hdl["id"],
+                             length=length, data=payload)
 
 def pr_country(hdl, data, offset):
     payload, length, offset = get_payload(data, offset)
     country = "".join([chr(a) for a in payload[0:3]])
-    return offset, IE_Country(name=f"IE {hdl['name']}", eid=hdl["id"],
-                              length=length, data=payload,
-                              country=country,
-                              channel_1st=int(payload[3]),
-                              nb_channels=int(payload[4]),
-                              max_tx_power=int(payload[5]))
+    return offset, new_model(IE_Country,
+                             name=f"IE {hdl['name']}", eid=hdl["id"],
+                             length=length, data=payload,
+                             country=country,
+                             channel_1st=int(payload[3]),
+                             nb_channels=int(payload[4]),
+                             max_tx_power=int(payload[5]))
 
 def pr_supported_rates(hdl, data, offset):
     payload, length, offset = get_payload(data, offset)
-    return offset, IE_Base(name=f"IE {hdl['name']}", eid=hdl["id"],
-                          length=length, data=payload)
+    return offset, new_model(IE_Base,
+                             name=f"IE {hdl['name']}", eid=hdl["id"],
+                             length=length, data=payload)
 
 def pr_ssid(hdl, data, offset):
     payload, length, offset = get_payload(data, offset)
     ssid = "".join([chr(a) for a in payload])
-    return offset, IE_SSID(name=f"IE {hdl['name']}", eid=hdl["id"],
-                          length=length, data=payload,
-                          ssid=ssid)
+    return offset, new_model(IE_SSID,
+                             name=f"IE {hdl['name']}", eid=hdl["id"],
+                             length=length, data=payload,
+                             ssid=ssid)
 
 def pr_base(hdl, data, offset):
     payload, length, offset = get_payload(data, offset)
-    return offset, IE_Base(name=f"IE {hdl['name']}", eid=hdl["id"],
-                          length=length, data=payload)
+    return offset, new_model(IE_Base,
+                             name=f"IE {hdl['name']}", eid=hdl["id"],
+                             length=length, data=payload)
+
+
+# the fixed part of the elements, little endian but the suite selectors.
+st_le16 = struct.Struct("<H")
+st_suite = struct.Struct(">I")
+st_ht_cap = struct.Struct("<HB16sHIB")
+st_ht_op = struct.Struct("<BBHH16s")
+st_vht_cap = struct.Struct("<IHHHH")
+st_vht_op = struct.Struct("<BBBH")
+st_he_cap = struct.Struct("<6s11sHH")
+st_he_op = struct.Struct("<3sBH")
+st_eht_cap = struct.Struct("<2s9s")
+st_eht_op = struct.Struct("<B4s")
+st_eht_op_info = struct.Struct("<BBB")
+
+def suite_name(v, names):
+    name = names.get(v)
+    return f"{v:08x}" if name is None else name
+
+def mcs_map_nss(v, nb=8):
+    """
+    returns the number of the spatial streams supported in a MCS map of
+    2 bits for each stream, 3 for not supported.
+    """
+    return sum([1 for i in range(nb) if (v >> (i*2)) & 3 != 3])
+
+def pr_fixed(model, decode):
+    """
+    returns a parser of an element with the fixed layout.
+    decode(payload in bytes) returns the fields of the model,
+    and the element of pr_base is returned if it is broken.
+    """
+    def parser(hdl, data, offset):
+        payload, length, next_offset = get_payload(data, offset)
+        try:
+            fields = decode(bytes(payload))
+        except (struct.error, IndexError):
+            return pr_base(hdl, data, offset)
+        return next_offset, new_model(model,
+                name=f"IE {hdl['name']}", eid=hdl["id"],
+                length=length, data=payload, **fields)
+    return parser
+
+def dec_rsn(b):
+    version, = st_le16.unpack_from(b, 0)
+    x = {"version": version, "group_cipher": None, "pairwise_ciphers": [],
+         "akm_suites": [], "rsn_capabilities": None, "mfp_capable": None,
+         "mfp_required": None, "pmkids": [], "group_mgmt_cipher": None}
+    offset = 2
+    # each field is optional at the end.
+    if offset + 4 <= len(b):
+        x["group_cipher"] = suite_name(st_suite.unpack_from(b, offset)[0],
+                                       cipher_suite_names)
+        offset += 4
+    for k,names in [("pairwise_ciphers", cipher_suite_names),
+                    ("akm_suites", akm_suite_names)]:
+        if offset + 2 > len(b):
+            return x
+        n, = st_le16.unpack_from(b, offset)
+        offset += 2
+        for i in range(n):
+            x[k].append(suite_name(st_suite.unpack_from(b, offset)[0], names))
+            offset += 4
+    if offset + 2 <= len(b):
+        cap, = st_le16.unpack_from(b, offset)
+        x["rsn_capabilities"] = cap
+        x["mfp_required"] = bool(cap & 0x0040)
+        x["mfp_capable"] = bool(cap & 0x0080)
+        offset += 2
+    if offset + 2 <= len(b):
+        n, = st_le16.unpack_from(b, offset)
+        offset += 2
+        for i in range(n):
+            if offset + 16 > len(b):
+                raise IndexError
+            x["pmkids"].append(b[offset:offset+16].hex(" "))
+            offset += 16
+    if offset + 4 <= len(b):
+        x["group_mgmt_cipher"] = suite_name(
+                st_suite.unpack_from(b, offset)[0], cipher_suite_names)
+    return x
+
+def dec_ht_cap(b):
+    info, ampdu, mcs, _, _, _ = st_ht_cap.unpack_from(b)
+    return {"ht_cap_info": info,
+            "channel_width_40": bool(info & 0x0002),
+            "short_gi_20": bool(info & 0x0020),
+            "short_gi_40": bool(info & 0x0040),
+            "ampdu_params": ampdu,
+            "rx_mcs": mcs[:10].hex(" "),
+            "nss": sum([1 for _ in mcs[:4] if _])}
+
+def dec_ht_op(b):
+    primary, info1, _, _, _ = st_ht_op.unpack_from(b)
+    return {"primary_channel": primary,
+            "secondary_channel_offset": ["none", "above", "reserved",
+                                         "below"][info1 & 3],
+            "sta_channel_width": "any" if info1 & 0x04 else "20"}
+
+def dec_vht_cap(b):
+    info, rx_map, _, tx_map, _ = st_vht_cap.unpack_from(b)
+    return {"vht_cap_info": info,
+            "max_mpdu_length": [3895, 7991, 11454, 0][info & 3],
+            "supported_channel_width_set": (info >> 2) & 3,
+            "rx_mcs_map": rx_map,
+            "tx_mcs_map": tx_map,
+            "nss": mcs_map_nss(rx_map)}
 
+def dec_vht_op(b):
+    width, seg0, seg1, basic = st_vht_op.unpack_from(b)
+    return {"channel_width": {0: "20/40", 1: "80/160/80+80", 2: "160",
+                              3: "80+80"}.get(width, "reserved"),
+            "center_freq_seg0": seg0,
+            "center_freq_seg1": seg1,
+            "basic_mcs_map": basic}
 
+def dec_he_cap(b):
+    mac, phy, rx_map, tx_map = st_he_cap.unpack_from(b, 1)
+    return {"mac_cap": mac.hex(" "),
+            "phy_cap": phy.hex(" "),
+            "channel_width_set": phy[0] >> 1,
+            "rx_mcs_80": rx_map,
+            "tx_mcs_80": tx_map,
+            "nss": mcs_map_nss(rx_map)}
+
+def dec_he_op(b):
+    params, color, basic = st_he_op.unpack_from(b, 1)
+    params = int.from_bytes(params, "little")
+    x = {"default_pe_duration": params & 7,
+         "twt_required": bool(params & 0x08),
+         "bss_color": color & 0x3f,
+         "bss_color_disabled": bool(color & 0x80),
+         "basic_mcs_nss": basic,
+         "vht_operation": None,
+         "primary_channel_6g": None,
+         "channel_width_6g": None}
+    offset = 1 + st_he_op.size
+    if params & (1 << 14):
+        x["vht_operation"] = b[offset:offset+3].hex(" ")
+        offset += 3
+    if params & (1 << 15):
+        offset += 1
+    if params & (1 << 17):
+        x["primary_channel_6g"] = b[offset]
+        x["channel_width_6g"] = b[offset+1] & 3
+    return x
+
+def dec_eht_cap(b):
+    mac, phy = st_eht_cap.unpack_from(b, 1)
+    return {"mac_cap": mac.hex(" "),
+            "phy_cap": phy.hex(" "),
+            "support_320mhz": bool(phy[0] & 0x02)}
+
+def dec_eht_op(b):
+    params, basic = st_eht_op.unpack_from(b, 1)
+    x = {"basic_mcs_nss": int.from_bytes(basic, "little"),
+         "channel_width": None, "ccfs0": None, "ccfs1": None,
+         "disabled_subchannel_bitmap": None}
+    offset = 1 + st_eht_op.size
+    if params & 0x01:
+        control, ccfs0, ccfs1 = st_eht_op_info.unpack_from(b, offset)
+        x["channel_width"] = {0: "20", 1: "40", 2: "80", 3: "160",
+                              4: "320"}.get(control & 7, "reserved")
+        x["ccfs0"] = ccfs0
+        x["ccfs1"] = ccfs1
+        offset += st_eht_op_info.size
+        if params & 0x02:
+            x["disabled_subchannel_bitmap"], = st_le16.unpack_from(b, offset)
+    return x
+
+pr_rsn = pr_fixed(IE_RSN, dec_rsn)
+pr_ht_cap = pr_fixed(IE_HT_Cap, dec_ht_cap)
+pr_ht_operation = pr_fixed(IE_HT_Operation, dec_ht_op)
+pr_vht_cap = pr_fixed(IE_VHT_Cap, dec_vht_cap)
+pr_vht_operation = pr_fixed(IE_VHT_Operation, dec_vht_op)
+
+def ext_fields(b):
+    return {"ext_id": b[0], "ext_name": eid_ext_table[b[0]] or "Unknown"}
+
+# the element ID extensions with a decoder.  the others are IE_Extension.
+ext_decoders = {
+    35: (IE_HE_Cap, dec_he_cap),
+    36: (IE_HE_Operation, dec_he_op),
+    106: (IE_EHT_Operation, dec_eht_op),
+    108: (IE_EHT_Cap, dec_eht_cap),
+    }
+
+ext_parsers = tuple([
+    pr_fixed(ext_decoders[i][0],
+             lambda b, dec=ext_decoders[i][1]: dict(ext_fields(b), **dec(b)))
+    if i in ext_decoders else pr_fixed(IE_Extension, ext_fields)
+    for i in range(256)])
+
+def pr_extension(hdl, data, offset):
+    # the element ID extension is the first octet of the body.
+    if data[offset+1] == 0 or offset + 2 >= len(data):
+        return pr_base(hdl, data, offset)
+    return ext_parsers[data[offset+2]](hdl, data, offset)
+
+
+# the elements with a parser or a name of their own.
+# the others are taken from ieee802_11_ids, generated by
+# conv_ieee802_11_defs.py, and parsed by pr_base.
 element_list = [
     {
         "id": 0,
@@ -173,251 +501,46 @@ element_list = [
         "name": "Country",
         "parser": pr_country,
     },
-    {
-        "id": 16,
-        "name": "CHALLENGE",
-        "parser": pr_base,
-    },
-    {
-        "id": 32,
-        "name": "PWR_CONSTRAINT",
-        "parser": pr_base,
-    },
-    {
-        "id": 33,
-        "name": "PWR_CAPABILITY",
-        "parser": pr_base,
-    },
-    {
-        "id": 34,
-        "name": "TPC_REQUEST",
-        "parser": pr_base,
-    },
-    {
-        "id": 35,
-        "name": "TPC_REPORT",
-        "parser": pr_base,
-    },
-    {
-        "id": 36,
-        "name": "SUPPORTED_CHANNELS",
-        "parser": pr_base,
-    },
-    {
-        "id": 37,
-        "name": "CHANNEL_SWITCH",
-        "parser": pr_base,
-    },
-    {
-        "id": 38,
-        "name": "MEASURE_REQUEST",
-        "parser": pr_base,
-    },
-    {
-        "id": 39,
-        "name": "MEASURE_REPORT",
-        "parser": pr_base,
-    },
-    {
-        "id": 40,
-        "name": "QUITE",
-        "parser": pr_base,
-    },
-    {
-        "id": 41,
-        "name": "IBSS_DFS",
-        "parser": pr_base,
-    },
-    {
-        "id": 42,
-        "name": "ERP_INFO",
-        "parser": pr_base,
-    },
     {
         "id": 45,
         "name": "HT_CAP",
-        "parser": pr_base,
+        "parser": pr_ht_cap,
     },
     {
         "id": 48,
         "name": "RSN",
-        "parser": pr_base,
-    },
-    {
-        "id": 50,
-        "name": "EXT_SUPP_RATES",
-        "parser": pr_base,
-    },
-    {
-        "id": 54,
-        "name": "MOBILITY_DOMAIN",
-        "parser": pr_base,
-    },
-    {
-        "id": 55,
-        "name": "FAST_BSS_TRANSITION",
-        "parser": pr_base,
-    },
-    {
-        "id": 56,
-        "name": "TIMEOUT_INTERVAL",
-        "parser": pr_base,
-    },
-    {
-        "id": 57,
-        "name": "RIC_DATA",
-        "parser": pr_base,
+        "parser": pr_rsn,
     },
     {
         "id": 61,
         "name": "HT_OPERATION",
-        "parser": pr_base,
-    },
-    {
-        "id": 62,
-        "name": "SECONDARY_CHANNEL_OFFSET",
-        "parser": pr_base,
-    },
-    {
-        "id": 68,
-        "name": "WAPI",
-        "parser": pr_base,
-    },
-    {
-        "id": 69,
-        "name": "TIME_ADVERTISEMENT",
-        "parser": pr_base,
-    },
-    {
-        "id": 72,
-        "name": "20_40_BSS_COEXISTENCE",
-        "parser": pr_base,
-    },
-    {
-        "id": 73,
-        "name": "20_40_BSS_INTOLERANT",
-        "parser": pr_base,
-    },
-    {
-        "id": 74,
-        "name": "OVERLAPPING_BSS_SCAN_PARAMS",
-        "parser": pr_base,
-    },
-    {
-        "id": 76,
-        "name": "MMIE",
-        "parser": pr_base,
-    },
-    {
-        "id": 84,
-        "name": "SSID_LIST",
-        "parser": pr_base,
-    },
-    {
-        "id": 90,
-        "name": "BSS_MAX_IDLE_PERIOD",
-        "parser": pr_base,
-    },
-    {
-        "id": 91,
-        "name": "TFS_REQ",
-        "parser": pr_base,
-    },
-    {
-        "id": 92,
-        "name": "TFS_RESP",
-        "parser": pr_base,
-    },
-    {
-        "id": 93,
-        "name": "WNMSLEEP",
-        "parser": pr_base,
-    },
-    {
-        "id": 98,
-        "name": "TIME_ZONE",
-        "parser": pr_base,
-    },
-    {
-        "id": 101,
-        "name": "LINK_ID",
-        "parser": pr_base,
-    },
-    {
-        "id": 107,
-        "name": "INTERWORKING",
-        "parser": pr_base,
-    },
-    {
-        "id": 108,
-        "name": "ADV_PROTO",
-        "parser": pr_base,
+        "parser": pr_ht_operation,
     },
     {
         "id": 111,
         "name": "ROAMING_CONSORTIUM",
         "parser": pr_roaming_consortium,
     },
-    {
-        "id": 127,
-        "name": "EXT_CAPAB",
-        "parser": pr_base,
-    },
-    {
-        "id": 156,
-        "name": "CCKM",
-        "parser": pr_base,
-    },
     {
         "id": 191,
         "name": "VHT_CAP",
-        "parser": pr_base,
+        "parser": pr_vht_cap,
     },
     {
         "id": 192,
         "name": "VHT_OPERATION",
-        "parser": pr_base,
-    },
-    {
-        "id": 193,
-        "name": "VHT_EXTENDED_BSS_LOAD",
-        "parser": pr_base,
-    },
-    {
-        "id": 194,
-        "name": "VHT_WIDE_BW_CHSWITCH",
-        "parser": pr_base,
-    },
-    {
-        "id": 195,
-        "name": "VHT_TRANSMIT_POWER_ENVELOPE",
-        "parser": pr_base,
-    },
-    {
-        "id": 196,
-        "name": "VHT_CHANNEL_SWITCH_WRAPPER",
-        "parser": pr_base,
-    },
-    {
-        "id": 197,
-        "name": "VHT_AID",
-        "parser": pr_base,
-    },
-    {
-        "id": 198,
-        "name": "VHT_QUIET_CHANNEL",
-        "parser": pr_base,
-    },
-    {
-        "id": 199,
-        "name": "VHT_OPERATING_MODE_NOTIFICATION",
-        "parser": pr_base,
+        "parser": pr_vht_operation,
     },
     {
         "id": 221,
         "name": "VENDOR_SPECIFIC",
         "parser": pr_vendor_specific,
     },
+    {
+        "id": 255,
+        "name": "EXTENSION",
+        "parser": pr_extension,
+    },
 ]
 
 elm_xxx = {
@@ -426,18 +549,27 @@ elm_xxx = {
         "parser": pr_base,
     }
 
+def make_dispatch():
+    """
+    returns the handler of each element ID in a tuple of 256.
+    """
+    elm_map = {i["id"]: i for i in element_list}
+    return tuple([elm_map.get(eid) or
+                  ({"id": eid, "name": eid_table[eid], "parser": pr_base}
+                   if eid_table[eid] else elm_xxx)
+                  for eid in range(256)])
+
+elm_dispatch = make_dispatch()
+elm_name_map = {h["name"]: h["id"] for h in elm_dispatch if h is not elm_xxx}
+
 def parse_ieee80211ie(data: list[int], verbosity=0):
-    elm_map = {}
-    for i in element_list:
-        elm_map.update({i["id"]: i})
-    #
     ieset = []
     data_len = len(data)
     offset = 0
     while offset < data_len:
         eid = data[offset]
-        h = elm_map.get(eid)
-        if h is not None:
+        h = elm_dispatch[eid]
+        if h is not elm_xxx:
             offset, elm = h["parser"](h, data, offset)
             if verbosity:
                 print(f"## {elm.eid}: {elm.name}")
@@ -452,6 +584,118 @@ def parse_ieee80211ie(data: list[int], verbosity=0):
         ieset.append(elm)
     return ieset
 
+class IEIndex():
+    """
+    the index of the elements in an IE blob for the callers to look at
+    a few elements, e.g. index.select("RSN", "SSID").
+    the blob is walked once to record (eid, offset, length) of each
+    element, and an element is decoded only when it is asked.
+    """
+    def __init__(self, data: bytes):
+        self.data = data
+        # eid, offset, length for each element.
+        self.index = array("H")
+        data_len = len(data)
+        offset = 0
+        while offset + 1 < data_len:
+            length = data[offset+1]
+            self.index.extend((data[offset], offset,
+                               min(length, data_len - offset - 2)))
+            offset += 2 + length
+
+    def __len__(self):
+        return len(self.index) // 3
+
+    def eids(self):
+        return self.index[0::3].tolist()
+
+    def find(self, eid, start=0):
+        """
+        returns the position of the element of eid from start, or -1.
+        """
+        for i in range(start, len(self)):
+            if self.index[i*3] == eid:
+                return i
+        return -1
+
+    def payload(self, i):
+        """
+        returns the body of the i-th element as a memoryview of the blob.
+        """
+        offset, length = self.index[i*3+1], self.index[i*3+2]
+        return memoryview(self.data)[offset+2:offset+2+length]
+
+    def decode(self, i):
+        """
+        returns the i-th element decoded.
+        """
+        eid, offset, length = self.index[i*3:i*3+3]
+        _, elm = elm_dispatch[eid]["parser"](
+                elm_dispatch[eid], list(self.data[offset:offset+2+length]), 0)
+        return elm
+
+    def get(self, eid):
+        """
+        returns the first element of eid decoded, or None.
+        """
+        i = self.find(eid)
+        return None if i < 0 else self.decode(i)
+
+    def get_all(self, eid):
+        return [self.decode(i) for i in range(len(self))
+                if self.index[i*3] == eid]
+
+    def select(self, *names):
+        """
+        returns a dict of the first element decoded for each name,
+        e.g. "RSN" or "SSID", or each element ID.
+        """
+        ret = {}
+        for name in names:
+            eid = name if isinstance(name, int) else elm_name_map[name]
+            ret[name] = self.get(eid)
+        return ret
+
+    def elements(self, *names):
+        """
+        returns the list of the elements of the names or the element IDs
+        decoded, in the order of the blob.
+        """
+        eids = set([_ if isinstance(_, int) else elm_name_map[_]
+                    for _ in names])
+        return [self.decode(i) for i in range(len(self))
+                if self.index[i*3] in eids]
+
+def index_ieee80211ie_hexdump(payload: str):
+    """
+    returns the IEIndex of the IEs in hex, i.e. "00 08 ...".
+    """
+    return IEIndex(bytes.fromhex(payload))
+
+# the IEs of an AP are dumped again and again in a log.
+# the elements decoded are kept for each blob in bytes, and shared by
+# the records of the same blob as the models are not modified.
+ie_cache_size = 4096
+
+@lru_cache(maxsize=ie_cache_size)
+def decode_ieee80211ie(data: bytes):
+    return parse_ieee80211ie(list(data))
+
+@lru_cache(maxsize=ie_cache_size)
+def select_ieee80211ie(data: bytes, names: tuple):
+    return IEIndex(data).elements(*names)
+
+def select_ieee80211ie_hexdump(*names):
+    """
+    returns a handler like parse_ieee80211ie_hexdump() which decodes only
+    the elements of the names through IEIndex, e.g. for wpal_bss.
+    """
+    def select_ieee80211ie_hexdump(ts, keys, verbosity=0):
+        return new_model(Packet,
+                         packet=select_ieee80211ie(bytes.fromhex(keys(2)),
+                                                   names))
+    return select_ieee80211ie_hexdump
+
 def parse_ieee80211ie_hexdump(ts, keys, verbosity=0):
     """
     ts: timestamp, str
@@ -464,9 +708,12 @@ def parse_ieee80211ie_hexdump(ts, keys, verbosity=0):
     if verbosity > 1:
         print("===")
         print("#", ts, len, payload)
-    d = [int(n,16) for n in payload.split()]
-    obj = parse_ieee80211ie(d, verbosity=verbosity)
-    return Packet(_name="IE", _hexstr=payload, packet=obj)
+    data = bytes.fromhex(payload)
+    if verbosity:
+        obj = parse_ieee80211ie(list(data), verbosity=verbosity)
+    else:
+        obj = decode_ieee80211ie(data)
+    return new_model(Packet, packet=obj)
 
 if __name__ == "__main__":
     test_payloads = [
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+
+"""
+measure the throughput of the parsers with a synthetic log.
+"""
+
+import os
+import sys
+import time
+import json
+import tempfile
+import contextlib
+import tracemalloc
+from wpal_gen import gen_log, default_mix, parse_mix
+from wpal_parse import parse_wpasup_log_line, re_ts, re_hdls, \
+        parse_wpasup_log, write_ndjson
+from parse_eap import parse_eapol_hexdump
+from parse_ieee80211ie import parse_ieee80211ie_hexdump, decode_ieee80211ie, \
+        index_ieee80211ie_hexdump
+
+def measure(func, nb_inputs, memory=True, repeat=3):
+    """
+    func: a function to return the number of the records made.
+    run func repeat times for the best time, and once more for the peak
+    memory with tracemalloc if memory is True.
+    """
+    elapsed = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        nb_records = func()
+        t = time.perf_counter() - t0
+        elapsed = t if elapsed is None else min(elapsed, t)
+    result = {
+        "inputs": nb_inputs,
+        "records": nb_records,
+        "elapsed": elapsed,
+        "inputs_per_sec": nb_inputs / elapsed if elapsed else 0,
+        "records_per_sec": nb_records / elapsed if elapsed else 0,
+        }
+    if memory:
+        tracemalloc.start()
+        func()
+        result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+def collect_keys(lines, hdl):
+    """
+    returns the list of (ts, keys) of the lines for the handler
+    to call it directly.
+    """
+    regex = [h["regex"] for h in re_hdls if h["hdl"] is hdl][0]
+    keys = []
+    for line in lines:
+        if r_ts := re_ts.match(line):
+            if r := regex.match(r_ts.group(2)):
+                keys.append((r_ts.group(1), r.group))
+    return keys
+
+def bench_all(nb_lines, mix=default_mix, seed=0, memory=True, repeat=3):
+    lines = list(gen_log(nb_lines, mix, seed=seed))
+    results = {}
+
+    # each run starts with the IE cache empty like a new process.
+    def run_lines():
+        decode_ieee80211ie.cache_clear()
+        return sum([1 for _ in lines
+                    if parse_wpasup_log_line(_) is not None])
+    results["parse_wpasup_log_line"] = measure(run_lines, len(lines),
+                                               memory, repeat)
+
+    for hdl in [parse_eapol_hexdump, parse_ieee80211ie_hexdump]:
+        keys = collect_keys(lines, hdl)
+        def run_hdl():
+            decode_ieee80211ie.cache_clear()
+            for ts,k in keys:
+                hdl(ts, k)
+            return len(keys)
+        results[hdl.__name__] = measure(run_hdl, len(keys), memory, repeat)
+
+    # the same IEs are decoded again and again in the target above, which
+    # takes them from the cache.  decode each one with the cache empty.
+    keys = collect_keys(lines, parse_ieee80211ie_hexdump)
+    def run_cold():
+        for ts,k in keys:
+            decode_ieee80211ie.cache_clear()
+            parse_ieee80211ie_hexdump(ts, k)
+        return len(keys)
+    results["parse_ieee80211ie (cold)"] = measure(
+            run_cold, len(keys), memory, repeat)
+
+    # the lazy index, looking at RSN and SSID only.
+    def run_index():
+        for ts,k in keys:
+            index_ieee80211ie_hexdump(k(2)).select("RSN", "SSID")
+        return len(keys)
+    results["IEIndex.select"] = measure(run_index, len(keys), memory, repeat)
+
+    import wpal_graph
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ndjson_file = os.path.join(tmp_dir, "bench.ndjson")
+        with open(ndjson_file, "w") as fd:
+            write_ndjson(parse_wpasup_log(lines), fd)
+        with open(ndjson_file) as fd:
+            nb_records = sum([1 for _ in fd])
+        def run_read_log():
+            # read_log prints the BSSIDs.
+            with open(os.devnull, "w") as fd_null:
+                with contextlib.redirect_stdout(fd_null):
+                    wpal_graph.read_log(ndjson_file, use_cache=False)
+            return nb_records
+        results["wpal_graph.read_log"] = measure(run_read_log, nb_records,
+                                                 memory, repeat)
+    return results
+
+def print_results(results):
+    print(f"{'target':<28} {'inputs':>8} {'records':>8} "
+          f"{'inputs/s':>10} {'records/s':>10} {'peak MB':>8}")
+    for name,r in results.items():
+        peak = r.get("peak_memory")
+        print(f"{name:<28} {r['inputs']:>8} {r['records']:>8} "
+              f"{r['inputs_per_sec']:>10.0f} {r['records_per_sec']:>10.0f} "
+              f"{'-' if peak is None else f'{peak/1e6:.1f}':>8}")
+
+def compare_results(results, baseline, tolerance):
+    """
+    returns the list of the targets slower than the baseline
+    beyond the tolerance.
+    """
+    slower = []
+    for name,r in results.items():
+        b = baseline.get(name)
+        if b and r["inputs_per_sec"] < b["inputs_per_sec"]*(1 - tolerance):
+            slower.append(name)
+            print(f"REGRESSION: {name} {r['inputs_per_sec']:.0f}/s "
+                  f"< {b['inputs_per_sec']:.0f}/s")
+    return slower
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", action="store", dest="nb_lines", type=int,
+                    default=100000,
+                    help="specify the number of the lines generated.")
+    ap.add_argument("-m", action="store", dest="mix", type=parse_mix,
+                    default=default_mix,
+                    help="specify the weights of the kinds of the lines, "
+                    "e.g. attempt=1,ie=1,noise=20")
+    ap.add_argument("-s", action="store", dest="seed", type=int, default=0,
+                    help="specify the random seed.")
+    ap.add_argument("-r", action="store", dest="repeat", type=int, default=3,
+                    help="specify the number of the runs to take the best.")
+    ap.add_argument("--no-memory", action="store_false", dest="memory",
+                    help="disable to measure the peak memory.")
+    ap.add_argument("-o", action="store", dest="output_file",
+                    help="specify a file to save the results in JSON.")
+    ap.add_argument("--compare", action="store", dest="baseline_file",
+                    help="specify a file of the results to compare with.")
+    ap.add_argument("--tolerance", action="store", dest="tolerance",
+                    type=float, default=0.1,
+                    help="specify the ratio of the slowdown allowed.")
+    opt = ap.parse_args()
+    results = bench_all(opt.nb_lines, opt.mix, opt.seed, opt.memory,
+                        opt.repeat)
+    print_results(results)
+    if opt.output_file:
+        with open(opt.output_file, "w") as fd:
+            json.dump(results, fd, indent=4)
+    if opt.baseline_file:
+        with open(opt.baseline_file) as fd:
+            if compare_results(results, json.load(fd), opt.tolerance):
+                sys.exit(1)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+
+"""
+keep the table of the BSSs seen in the IE dumps of the records of
+wpal_parse, and yield an event when a BSS is found or its capabilities
+are changed.  an IE dump does not have the BSSID, so it is taken from
+the last "Trying to associate" of the source if both the SSID and the
+channel are the same, and is None otherwise, e.g. for the scan results
+of the other APs of the same SSID.  a BSS of which the BSSID is not known
+is identified by the SSID and the channel.
+only the elements in bss_elements are looked at, which wpal_parse --bss
+decodes through the lazy index of the IEs, and an entry is updated only
+when the digest of them is changed, so the repeated beacons of a BSS cost
+a digest each.
+"""
+
+import sys
+import json
+from wpal_input import is_ie_packet, ie_digest
+
+# the names of the elements of the extension to the PHY.
+phy_ext_names = {"HE_CAPABILITIES": "HE", "EHT_CAPABILITIES": "EHT"}
+
+# the elements of the summary: SSID, DS Parameter Set, Country, HT
+# Capabilities, RSN, HT Operation, VHT Capabilities, Vendor Specific and
+# the extensions.
+bss_elements = (0, 3, 7, 45, 48, 61, 191, 221, 255)
+
+rsn_keys = [ "group_cipher", "pairwise_ciphers", "akm_suites",
+             "mfp_capable", "mfp_required", "group_mgmt_cipher" ]
+
+def ssid_of(packet):
+    for e in packet:
+        if e["eid"] == 0:
+            return e.get("ssid")
+    return None
+
+def freq_to_channel(freq):
+    """
+    returns the channel of the frequency in MHz, or None.
+    """
+    if freq is None:
+        return None
+    if freq == 2484:
+        return 14
+    if 2412 <= freq < 2484:
+        return (freq - 2407) // 5
+    if 5000 <= freq < 5950:
+        return (freq - 5000) // 5
+    if 5950 < freq <= 7115:
+        return (freq - 5950) // 5
+    return None
+
+def channel_of(packet):
+    """
+    returns the channel of the DS Parameter Set, or the primary channel
+    of the HT Operation, or None.
+    """
+    channel = None
+    for e in packet:
+        if e["eid"] == 3 and e["data"]:
+            return int(e["data"].split()[0], 16)
+        elif e["eid"] == 61 and e.get("primary_channel") is not None:
+            channel = e["primary_channel"]
+    return channel
+
+def bss_summary(packet):
+    """
+    returns the capabilities in dict of the elements of an IE record
+    in dict.
+    """
+    x = {"country": None, "channel": channel_of(packet), "rsn": None,
+         "phy": [], "vendors": []}
+    for e in packet:
+        eid = e["eid"]
+        if eid == 7 and "country" in e:
+            x["country"] = e["country"].strip()
+        elif eid == 48 and "akm_suites" in e:
+            x["rsn"] = {k: e.get(k) for k in rsn_keys}
+        elif eid == 45:
+            x["phy"].append("HT")
+        elif eid == 191:
+            x["phy"].append("VHT")
+        elif eid == 255 and e.get("ext_name") in phy_ext_names:
+            x["phy"].append(phy_ext_names[e["ext_name"]])
+        elif eid == 221:
+            v = e.get("vendor", "Unknown")
+            if e.get("voi_type"):
+                v = f"{v}: {e['voi_type']}"
+            if v not in x["vendors"]:
+                x["vendors"].append(v)
+    return x
+
+class BSSTable():
+    """
+    the entries by (BSSID, SSID), or by (None, SSID, channel) if the BSSID
+    is not known.
+    """
+    def __init__(self):
+        self.entries = {}
+
+    def update(self, ts, bssid, packet, digest=None):
+        """
+        returns the event in dict if the BSS is new or changed, or None.
+        """
+        if digest is None:
+            digest = ie_digest(packet)
+        ssid = ssid_of(packet)
+        key = (bssid, ssid) if bssid else (None, ssid, channel_of(packet))
+        a = self.entries.get(key)
+        if a is not None:
+            a["ts_last"] = ts
+            a["count"] += 1
+            if a["ie_hash"] == digest:
+                return None
+        x = bss_summary(packet)
+        if a is None:
+            self.entries[key] = {"bssid": bssid, "ssid": ssid,
+                                 "ts_first": ts, "ts_last": ts, "count": 1,
+                                 "ie_hash": digest, "bss": x}
+            return {"type": "bss", "event": "new", "bssid": bssid,
+                    "ssid": ssid, "ie_hash": digest, "bss": x}
+        a["ie_hash"] = digest
+        changes = {k: [a["bss"][k], v] for k,v in x.items()
+                   if a["bss"][k] != v}
+        if not changes:
+            # e.g. only the TIM is changed.
+            return None
+        a["bss"] = x
+        return {"type": "bss", "event": "changed", "bssid": bssid,
+                "ssid": ssid, "ie_hash": digest, "changes": changes}
+
+    def dict(self):
+        return list(self.entries.values())
+
+def track_bss(records, table=None):
+    """
+    records: an iterable of the records in dict.
+    table: a BSSTable to be updated, or a new one.
+    yields the events of the BSSs.
+    """
+    if table is None:
+        table = BSSTable()
+    assocs = {}
+    for r in records:
+        msg = r["msg"]
+        source = r.get("source")
+        if msg.get("type") == "BSSID":
+            assocs[source] = (msg["state"], msg.get("ssid"),
+                              freq_to_channel(msg.get("freq")))
+            continue
+        if not is_ie_packet(msg):
+            continue
+        packet = [e for e in msg["packet"] if e["eid"] in bss_elements]
+        bssid, ssid, channel = assocs.get(source, (None, None, None))
+        if (channel is None or ssid != ssid_of(packet) or
+                channel != channel_of(packet)):
+            bssid = None
+        x = table.update(r["ts"], bssid, packet)
+        if x is not None:
+            e = {"ts": r["ts"], "msg": x}
+            if source is not None:
+                e["source"] = source
+            yield e
+
+if __name__ == "__main__":
+    import argparse
+    from wpal_input import open_log, read_records, resolve_ie_refs
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-f", action="store", dest="log_file",
+                    help="specify the output of wpal_parse.")
+    ap.add_argument("-o", action="store", dest="output_file")
+    ap.add_argument("--table", action="store", dest="table_file",
+                    help="specify a file to write the BSS table at the end.")
+    opt = ap.parse_args()
+    if opt.log_file and opt.log_file != "-":
+        fd = open_log(opt.log_file)
+    else:
+        fd = sys.stdin
+    if opt.output_file and opt.output_file != "-":
+        fd_out = open(opt.output_file, "w")
+    else:
+        fd_out = sys.stdout
+    table = BSSTable()
+    for x in track_bss(resolve_ie_refs(read_records(fd)), table):
+        fd_out.write(json.dumps(x, separators=(",",":")))
+        fd_out.write("\n")
+    if opt.table_file:
+        with open(opt.table_file, "w") as fd:
+            json.dump(table.dict(), fd, indent=4)
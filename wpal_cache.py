@@ -0,0 +1,96 @@
+import os
+import json
+import hashlib
+
+def parser_version(hdls, modules):
+    """
+    returns a digest of the handler set and the source of the parsers
+    so that the cached results are discarded when either one is changed.
+    hdls: the list of the handlers, e.g. re_hdls.
+    modules: the modules of the parsers.
+    """
+    h = hashlib.sha256()
+    for x in hdls:
+        h.update(x["regex"].pattern.encode())
+        h.update(x["hdl"].__qualname__.encode())
+    for m in modules:
+        with open(m.__file__, "rb") as fd:
+            h.update(fd.read())
+    return h.hexdigest()
+
+def input_key(log_file, content_hash=False):
+    """
+    returns the identity of the file, either its (inode, size, mtime) or
+    a digest of its content.
+    """
+    if content_hash:
+        h = hashlib.sha256()
+        with open(log_file, "rb") as fd:
+            while buf := fd.read(1<<20):
+                h.update(buf)
+        return h.hexdigest()
+    st = os.stat(log_file)
+    return [st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns]
+
+def cache_key(*args):
+    return hashlib.sha256(json.dumps(args).encode()).hexdigest()
+
+def cache_get(cache_dir, key):
+    """
+    returns the path of the cached result, or None.
+    the mtime of the entry is updated as the time of the last use.
+    """
+    path = os.path.join(cache_dir, key)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+def cache_evict(cache_dir, max_size):
+    """
+    remove the least recently used entries until the total size of the
+    cache becomes less than max_size in bytes.
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".tmp"):
+            continue
+        st = os.stat(os.path.join(cache_dir, name))
+        entries.append((st.st_mtime_ns, st.st_size, name))
+    total = sum([_[1] for _ in entries])
+    for _,size,name in sorted(entries):
+        if total <= max_size:
+            break
+        os.remove(os.path.join(cache_dir, name))
+        total -= size
+
+class CacheWriter():
+    """
+    write the output both to fd_out and to a new entry of the cache.
+    the entry is added by commit(), and evicts the old entries.
+    """
+    def __init__(self, cache_dir, key, fd_out, max_size):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, key)
+        self.tmp = f"{self.path}.{os.getpid()}.tmp"
+        self.fd_out = fd_out
+        self.fd_cache = open(self.tmp, "w")
+        self.max_size = max_size
+
+    def write(self, s):
+        self.fd_out.write(s)
+        self.fd_cache.write(s)
+
+    def flush(self):
+        self.fd_out.flush()
+
+    def commit(self):
+        self.fd_cache.close()
+        os.replace(self.tmp, self.path)
+        cache_evict(self.cache_dir, self.max_size)
+
+    def abort(self):
+        self.fd_cache.close()
+        os.remove(self.tmp)
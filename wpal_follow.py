@@ -0,0 +1,105 @@
+import os
+import time
+import json
+
+def load_checkpoint(checkpoint):
+    """
+    returns a dict of {"inode", "offset"}, or None.
+    """
+    if checkpoint is None or not os.path.exists(checkpoint):
+        return None
+    with open(checkpoint) as fd:
+        return json.load(fd)
+
+def save_checkpoint(checkpoint, inode, offset):
+    if checkpoint is None:
+        return
+    tmp = f"{checkpoint}.tmp"
+    with open(tmp, "w") as fd:
+        json.dump({"inode": inode, "offset": offset}, fd)
+    os.replace(tmp, checkpoint)
+
+def find_file_by_inode(log_file, inode):
+    """
+    find the file having the inode from the directory of the log file
+    so that a log rotated while the parser was stopped, e.g. log.1,
+    can be finished first.
+    """
+    dir_name = os.path.dirname(log_file) or "."
+    names = [log_file] + [os.path.join(dir_name, _)
+                          for _ in sorted(os.listdir(dir_name))]
+    for path in names:
+        try:
+            if os.stat(path).st_ino == inode:
+                return path
+        except OSError:
+            pass
+    return None
+
+def follow_log(log_file, checkpoint=None, interval=1.0, on_idle=None):
+    """
+    yield each line of a growing log like "tail -F".
+    a rotated or truncated log is followed by the file name.
+    checkpoint: a file name to save the inode and the offset of the lines
+        consumed.  the position is restored from it at the start.
+    on_idle: a function called before the checkpoint is saved,
+        e.g. to flush the output.
+    """
+    fd = None
+    inode = None
+    offset = 0
+    cp = load_checkpoint(checkpoint)
+    if cp:
+        path = find_file_by_inode(log_file, cp["inode"])
+        if path:
+            fd = open(path, "rb")
+            inode = cp["inode"]
+            if os.fstat(fd.fileno()).st_size >= cp["offset"]:
+                offset = cp["offset"]
+                fd.seek(offset)
+    try:
+        while True:
+            if fd is None:
+                try:
+                    fd = open(log_file, "rb")
+                except FileNotFoundError:
+                    time.sleep(interval)
+                    continue
+                inode = os.fstat(fd.fileno()).st_ino
+                offset = 0
+            # read the complete lines.
+            while True:
+                line = fd.readline()
+                if not line.endswith(b"\n"):
+                    fd.seek(offset)
+                    break
+                yield line.decode(errors="replace")
+                # the line has been consumed when the generator resumes.
+                offset += len(line)
+            # at the end of the file.
+            try:
+                st = os.stat(log_file)
+            except FileNotFoundError:
+                st = None
+            if st is not None and st.st_ino != inode:
+                # rotated.  switch to the new file when the old one is done.
+                if os.fstat(fd.fileno()).st_size > offset:
+                    continue
+                fd.close()
+                fd = None
+                continue
+            if st is not None and st.st_size < offset:
+                # truncated.
+                offset = 0
+                fd.seek(0)
+                continue
+            if on_idle:
+                on_idle()
+            save_checkpoint(checkpoint, inode, offset)
+            time.sleep(interval)
+    finally:
+        if fd is not None:
+            if on_idle:
+                on_idle()
+            save_checkpoint(checkpoint, inode, offset)
+            fd.close()
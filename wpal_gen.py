@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+
+"""
+generate a synthetic log like "wpa_supplicant -t -dd" for the benchmark.
+"""
+
+import random
+import struct
+
+noise_list = [
+    "wlan0: Event SCAN_RESULTS (3) received",
+    "nl80211: Received scan results (12 BSSes)",
+    "wlan0: BSS: Add new id 5 BSSID {bssid} SSID '{ssid}' freq 5180",
+    "wlan0: BSS: Remove id 5 BSSID {bssid} SSID '{ssid}' due to no match",
+    "EAPOL: startWhen --> 0",
+    "EAPOL: disable timer tick",
+    "EAPOL: txStart",
+    "l2_packet_receive: src={bssid} len=99",
+    "wlan0: WPA: RX message 1 of 4-Way Handshake from {bssid} (ver=2)",
+    "WPA: Replay Counter - hexdump(len=8): 00 00 00 00 00 00 00 01",
+    "nl80211: Event message available",
+    "nl80211: Drv Event 46 (NL80211_CMD_CONNECT) received for wlan0",
+    "wlan0: Control interface command 'STATUS'",
+    "CTRL_IFACE monitor sent successfully to /tmp/wpa_ctrl_1234-1",
+    "RTM_NEWLINK: ifi_index=3 ifname=wlan0 operstate=6 linkmode=1 "
+    "ifi_family=0 ifi_flags=0x11043 ([UP][RUNNING][LOWER_UP])",
+    ]
+
+def hexs(data):
+    return " ".join([f"{_:02x}" for _ in data])
+
+def eapol(type, body, version=2):
+    return struct.pack("!BBH", version, type, len(body)) + body
+
+def eap(code, identifier, type=None, data=b""):
+    if type is None:
+        return struct.pack("!BBH", code, identifier, 4)
+    return struct.pack("!BBHB", code, identifier, 5+len(data), type) + data
+
+def eapol_key(key_info, replay, key_data=b""):
+    """
+    an EAPOL-Key frame of the RSN descriptor.
+    """
+    nonce = bytes(random.getrandbits(8) for _ in range(32))
+    mic = bytes(16) if not key_info & 0x0100 else bytes(
+            random.getrandbits(8) for _ in range(16))
+    body = struct.pack("!BHHQ32s16s8s8s16sH", 2, key_info, 16, replay,
+                       nonce, bytes(16), bytes(8), bytes(8), mic,
+                       len(key_data)) + key_data
+    return eapol(3, body)
+
+def tls_certificate(certs):
+    """
+    a TLS record of a Certificate handshake message.
+    """
+    chain = b"".join([len(_).to_bytes(3, "big") + _ for _ in certs])
+    body = len(chain).to_bytes(3, "big") + chain
+    hs = bytes([11]) + len(body).to_bytes(3, "big") + body
+    return struct.pack("!BHH", 22, 0x0303, len(hs)) + hs
+
+rsn_ie = bytes.fromhex("30140100000fac040100000fac040100000fac028c00")
+
+def make_ie(ssid, channel):
+    ie = bytes([0, len(ssid)]) + ssid.encode()
+    ie += bytes.fromhex("01088c129824b048606c")
+    ie += bytes([3, 1, channel])
+    ie += bytes.fromhex("070a4a5020240817640a1e00")
+    ie += rsn_ie
+    ie += bytes.fromhex("2d1aef0903ffff0000000000000000000001"
+                        "00000000000000000000")
+    ie += bytes.fromhex("dd05506f9a1020")
+    ie += bytes.fromhex("dd180050f2020101800003a4000027a4"
+                        "000042435e0062322f00")
+    return ie
+
+def channel_freq(channel):
+    return 2407 + channel*5 if channel <= 13 else 5000 + channel*5
+
+def gen_attempt(identity, bssid, ssid, channel=36):
+    """
+    yield the messages of a connection attempt in order.
+    """
+    yield "wlan0: State: DISCONNECTED -> SCANNING"
+    yield "wlan0: State: SCANNING -> AUTHENTICATING"
+    yield (f"wlan0: Trying to associate with {bssid} "
+           f"(SSID='{ssid}' freq={channel_freq(channel)} MHz)")
+    yield "wlan0: State: AUTHENTICATING -> ASSOCIATING"
+    yield "wlan0: State: ASSOCIATING -> ASSOCIATED"
+    yield "EAPOL: SUPP_PAE entering state CONNECTING"
+    yield "EAPOL: SUPP_BE entering state IDLE"
+    eap_id = random.getrandbits(8)
+    for msg in [
+            ("RX", eap(1, eap_id, 1)),
+            ("TX", eap(2, eap_id, 1, identity.encode())),
+            ("RX", eap(1, (eap_id + 1) & 0xff, 13, b"\x20")),
+            ]:
+        yield "{} EAPOL - hexdump(len={}): {}".format(
+                msg[0], len(eapol(0, msg[1])), hexs(eapol(0, msg[1])))
+        if msg[0] == "RX":
+            yield "EAP: EAP entering state RECEIVED"
+    yield "EAPOL: SUPP_PAE entering state AUTHENTICATING"
+    # a server certificate in fragments.
+    cert = tls_certificate([bytes(random.getrandbits(8)
+                                  for _ in range(random.randint(700, 2000)))
+                            for _ in range(2)])
+    frag_size = 1024
+    frags = [cert[i:i+frag_size] for i in range(0, len(cert), frag_size)]
+    for i,frag in enumerate(frags):
+        eap_id = (eap_id + 2) & 0xff
+        flags = 0x40 if i < len(frags) - 1 else 0
+        data = bytes([flags | (0x80 if i == 0 else 0)])
+        if i == 0:
+            data += struct.pack("!I", len(cert))
+        p = eapol(0, eap(1, eap_id, 13, data + frag))
+        yield f"RX EAPOL - hexdump(len={len(p)}): {hexs(p)}"
+        yield "EAP: EAP entering state METHOD"
+        p = eapol(0, eap(2, eap_id, 13, b"\x00"))
+        yield f"TX EAPOL - hexdump(len={len(p)}): {hexs(p)}"
+    p = eapol(0, eap(3, (eap_id + 1) & 0xff))
+    yield f"RX EAPOL - hexdump(len={len(p)}): {hexs(p)}"
+    yield "EAP: EAP entering state SUCCESS"
+    yield "EAPOL: SUPP_PAE entering state AUTHENTICATED"
+    yield "wlan0: State: ASSOCIATED -> 4WAY_HANDSHAKE"
+    replay = random.getrandbits(32)
+    pmkid = bytes.fromhex("dd14000fac04") + bytes(16)
+    for dir,key_info,key_data in [
+            ("RX", 0x008a, pmkid),
+            ("TX", 0x010a, rsn_ie),
+            ("RX", 0x13ca, bytes(56)),
+            ("TX", 0x030a, b""),
+            ]:
+        if dir == "RX":
+            replay += 1
+        p = eapol_key(key_info, replay, key_data)
+        yield f"{dir} EAPOL - hexdump(len={len(p)}): {hexs(p)}"
+    yield "wlan0: State: 4WAY_HANDSHAKE -> GROUP_HANDSHAKE"
+    yield "wlan0: State: GROUP_HANDSHAKE -> COMPLETED"
+
+default_mix = {"attempt": 1, "ie": 1, "noise": 20}
+
+def gen_log(nb_lines, mix=default_mix, ts=1673167573.0, seed=None):
+    """
+    yield nb_lines lines of the log.
+    mix: the weights of the kinds of the lines.
+        attempt: a message of a connection attempt, i.e. the states and
+            the EAPOL frames.
+        ie: an IE dump.
+        noise: a line ignored by the parser.
+    """
+    if seed is not None:
+        random.seed(seed)
+    bss_list = [(":".join([f"{random.getrandbits(8):02x}" for _ in range(6)]),
+                 f"ssid-{i}") for i in range(16)]
+    channels = {ssid: random.choice([1, 6, 11, 36, 100])
+                for bssid,ssid in bss_list}
+    ies = [make_ie(ssid, channels[ssid]) for bssid,ssid in bss_list]
+    kinds = list(mix.keys())
+    weights = list(mix.values())
+    attempt = None
+    for _ in range(nb_lines):
+        ts += random.expovariate(1000)
+        kind = random.choices(kinds, weights)[0]
+        if kind == "attempt":
+            msg = next(attempt, None) if attempt else None
+            if msg is None:
+                bssid, ssid = random.choice(bss_list)
+                attempt = gen_attempt("anonymous@example.net", bssid, ssid,
+                                      channels[ssid])
+                msg = next(attempt)
+        elif kind == "ie":
+            ie = random.choice(ies)
+            msg = f"IEs - hexdump(len={len(ie)}): {hexs(ie)}"
+        else:
+            bssid, ssid = random.choice(bss_list)
+            msg = random.choice(noise_list).format(bssid=bssid, ssid=ssid)
+        yield f"{ts:.6f}: {msg}\n"
+
+def parse_mix(s):
+    """
+    "attempt=1,ie=1,noise=20" into a dict.
+    """
+    mix = {}
+    for x in s.split(","):
+        k,v = x.split("=")
+        if k not in default_mix:
+            raise ValueError(f"ERROR: unknown kind {k}")
+        mix[k] = float(v)
+    return mix
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", action="store", dest="nb_lines", type=int,
+                    default=100000,
+                    help="specify the number of the lines.")
+    ap.add_argument("-m", action="store", dest="mix", type=parse_mix,
+                    default=default_mix,
+                    help="specify the weights of the kinds of the lines, "
+                    "e.g. attempt=1,ie=1,noise=20")
+    ap.add_argument("-s", action="store", dest="seed", type=int,
+                    help="specify the random seed.")
+    ap.add_argument("-o", action="store", dest="output_file")
+    opt = ap.parse_args()
+    if opt.output_file and opt.output_file != "-":
+        fd_out = open(opt.output_file, "w")
+    else:
+        fd_out = sys.stdout
+    fd_out.writelines(gen_log(opt.nb_lines, opt.mix, seed=opt.seed))
@@ -1,9 +1,14 @@
 #!/usr/bin/env python
 
 from wpal_parse import Line
+from wpal_input import open_log, list_log_files, read_records
 import json
+import os
+import sys
+import numpy as np
 from matplotlib import pyplot as plt
 from datetime import datetime
+from types import SimpleNamespace
 
 state_val = {
     "EAPOL_PAE": [
@@ -64,70 +69,161 @@ def print_existing_state(pel):
     print("\n## STATE USED")
     for a in pel:
         for b in a["states"].keys():
-            state_list = set([_["state"] for _ in a["states"][b]])
+            state_list = set(a["states"][b]["state"])
             print(b, state_list)
 
-def read_log(log_file):
-    if log_file == "-":
-        fd = sys.stdin
-    elif log_file:
-        fd = open(log_file)
-    #
-    vx = {
-        "packets": {
-            "rx_id": [],
-            "tx_id": [],
-            "rx_oth": [],
-            "tx_oth": [],
-            },
-        "states": { }
-        }
-    ts_epoc = 0
-    if opt.ts_absolute:
-        ts_conv = lambda x_cur, x_epoc: x_cur
+def record_hook(x):
+    """
+    make a JSON object accessible by attribute like the models
+    without any validation.
+    """
+    return SimpleNamespace(**x)
+
+event_kinds = [ "rx_id", "tx_id", "rx_oth", "tx_oth",
+                "EAPOL_PAE", "EAPOL_BE", "EAP", "I/F", "BSSID" ]
+packet_kinds = event_kinds[:4]
+event_dtype = np.dtype([("ts", "<f8"), ("kind", "u1"), ("code", "<u4")])
+cache_magic = b"WPALC1\n"
+
+def load_events(fd, validate=False):
+    """
+    read the records and convert them into the columns.
+    returns a structured array of event_dtype, and the meta data, in which
+    "names" is the list of the state names referred by "code".
+    """
+    events = []
+    names = {}
+    ts_start = ts_end = 0
+    if validate:
+        records = (Line.parse_obj(x) for x in read_records(fd))
     else:
-        ts_conv = lambda x_cur, x_epoc: x_cur - x_epoc
-    for x in json.load(fd): 
-        line = Line.parse_obj(x)
-        ts_cur = line.ts
-        if ts_epoc == 0:
-            ts_epoc = ts_cur    # save ts_epoc only once
-        ts = ts_conv(ts_cur, ts_epoc)
+        records = read_records(fd, object_hook=record_hook)
+    for line in records:
+        ts_end = line.ts
+        if ts_start == 0:
+            ts_start = ts_end    # save ts_start only once
         # EAPOL, EAP, Request, Identity
         # EAPOL, EAP, Response, Identity
         # EAPOL, EAP, Request, Other
         # EAPOL, EAP, Response, Other
-        #eapol = [x for x in line.msg.packet if x.packet_name == "EAPOL"][0]
         if line.msg.type == "packet":
-            eapx = [x for x in line.msg.packet if x.packet_name == "EAP"]
+            eapx = [x for x in line.msg.packet
+                    if getattr(x, "packet_name", None) == "EAP"]
             if eapx:
                 eap = eapx[0]
-                xpkt = vx["packets"]
+                is_id = (hasattr(eap.Type, "Text") and
+                         eap.Type.Text == "Identity")
                 if eap.Code.Text == "Response":
-                    if hasattr(eap.Type, "Text") and eap.Type.Text == "Identity":
-                        xpkt.setdefault("rx_id", []).append(ts)
-                    else:
-                        xpkt.setdefault("rx_oth", []).append(ts)
+                    kind = "rx_id" if is_id else "rx_oth"
                 else:
-                    if hasattr(eap.Type, "Text") and eap.Type.Text == "Identity":
-                        xpkt.setdefault("tx_id", []).append(ts)
-                    else:
-                        xpkt.setdefault("tx_oth", []).append(ts)
-        elif line.msg.type in [ "EAPOL_PAE", "EAPOL_BE", "EAP", "I/F" ]:
-            x2 = vx["states"].setdefault(line.msg.type, [])
-            x2.append({"ts": ts, "state": line.msg.state})
-        elif line.msg.type == "BSSID":
-            print("\n## BSSID", line.msg.state)
+                    kind = "tx_id" if is_id else "tx_oth"
+                events.append((ts_end, event_kinds.index(kind), 0))
+        elif line.msg.type in event_kinds:
+            code = names.setdefault(line.msg.state, len(names))
+            events.append((ts_end, event_kinds.index(line.msg.type), code))
+    meta = {
+        "names": list(names.keys()),
+        "ts_start": ts_start,
+        "ts_end": ts_end,
+        }
+    return np.array(events, dtype=event_dtype), meta
+
+def write_event_cache(cache_file, events, meta):
+    """
+    the cache file consists of the magic, a line of the meta data in JSON,
+    and the raw array of the events aligned to 16 bytes.
+    """
+    meta = dict(meta, count=len(events))
+    header = json.dumps(meta).encode()
+    pad = -(len(cache_magic) + len(header) + 1) % 16
+    tmp = f"{cache_file}.tmp"
+    with open(tmp, "wb") as fd:
+        fd.write(cache_magic)
+        fd.write(header + b" "*pad + b"\n")
+        fd.write(events.tobytes())
+    os.replace(tmp, cache_file)
+
+def read_event_cache(cache_file):
+    """
+    returns the events memory-mapped from the cache file and the meta data,
+    or None if the cache is not available.
+    """
+    try:
+        with open(cache_file, "rb") as fd:
+            if fd.readline() != cache_magic:
+                return None
+            meta = json.loads(fd.readline())
+            offset = fd.tell()
+    except (OSError, ValueError):
+        return None
+    if meta["count"] == 0:
+        return np.zeros(0, dtype=event_dtype), meta
+    events = np.memmap(cache_file, dtype=event_dtype, mode="r",
+                       offset=offset, shape=(meta["count"],))
+    return events, meta
+
+def read_events(log_file, validate=False, use_cache=True):
+    """
+    returns the events and the meta data of the log file.
+    the events are written into the cache file, <log_file>.wpalc, at the
+    first time, and are memory-mapped from it later as long as the size
+    and the mtime of the log file are not changed.
+    """
+    if log_file == "-":
+        return load_events(sys.stdin, validate)
+    st = os.stat(log_file)
+    source = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    cache_file = f"{log_file}.wpalc"
+    if use_cache:
+        cached = read_event_cache(cache_file)
+        if cached and cached[1].get("source") == source:
+            return cached
+    with open_log(log_file) as fd:
+        events, meta = load_events(fd, validate)
+    meta["source"] = source
+    if use_cache:
+        try:
+            write_event_cache(cache_file, events, meta)
+        except OSError as e:
+            print("WARNING: the cache was not written.", e, file=sys.stderr)
+    return events, meta
+
+def read_log(log_file, validate=False, use_cache=True, ts_absolute=False):
+    events, meta = read_events(log_file, validate, use_cache)
+    ts_epoc = meta["ts_start"]
+    if ts_absolute:
+        ts = np.asarray(events["ts"])
+    else:
+        ts = events["ts"] - ts_epoc
+    names = np.array(meta["names"], dtype=object)
+    kind = np.asarray(events["kind"])
+    vx = {
+        "packets": { },
+        "states": { }
+        }
+    for i,k in enumerate(packet_kinds):
+        vx["packets"][k] = ts[kind == i]
+    # the states in the order of the first appearance.
+    kinds_found = [i for i in np.unique(kind) if event_kinds[i] not in
+                   packet_kinds]
+    for i in sorted(kinds_found, key=lambda i: np.argmax(kind == i)):
+        sel = kind == i
+        state = names[events["code"][sel]]
+        if event_kinds[i] == "BSSID":
+            for x in state:
+                print("\n## BSSID", x)
+        else:
+            vx["states"][event_kinds[i]] = {"ts": ts[sel], "state": state}
     vx.update({"ts_start": datetime.fromtimestamp(ts_epoc)})
-    vx.update({"ts_end": datetime.fromtimestamp(ts_cur)})
+    vx.update({"ts_end": datetime.fromtimestamp(meta["ts_end"])})
     return vx
 
 if __name__ == "__main__":
     import argparse
-    import sys
     ap = argparse.ArgumentParser()
     ap.add_argument("-f", action="append", dest="log_files",
-                    help="specify a log filename. can use in multiple times.")
+                    help="specify a log filename. can use in multiple times. "
+                    "a directory and a compressed file are accepted.")
     ap.add_argument("-t", action="store", dest="target",
                     type=int, default=None,
                     help="specify the number of the targt. {}".format(
@@ -137,14 +233,40 @@ if __name__ == "__main__":
                     help="specify the number of alignment to show the merged graph.")
     ap.add_argument("-T", action="store_true", dest="ts_absolute",
                     help="enable to show absolute timestamp.")
+    ap.add_argument("--validate", action="store_true", dest="validate",
+                    help="validate the records with the models.")
+    ap.add_argument("--no-cache", action="store_false", dest="use_cache",
+                    help="disable the event cache, <log_file>.wpalc.")
+    ap.add_argument("--test", action="store_true", dest="test")
     opt = ap.parse_args()
+    if opt.test:
+        import tempfile
+        from wpal_gen import gen_log
+        from wpal_parse import parse_wpasup_log, write_ndjson
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with open(os.path.join(tmp_dir, "a.ndjson"), "w") as fd:
+                write_ndjson(parse_wpasup_log(gen_log(2000, seed=1)), fd)
+            # the second run must not take the cache of the first as a log.
+            runs = []
+            for _ in range(2):
+                runs.append([read_events(f) for f in list_log_files(tmp_dir)])
+                print([os.path.basename(_) for _ in list_log_files(tmp_dir)])
+            assert len(runs[0]) == len(runs[1]) == 1
+            assert (runs[0][0][0] == runs[1][0][0]).all()
+            # the models must keep the packets as the fast path does.
+            validated = read_events(os.path.join(tmp_dir, "a.ndjson"),
+                                    validate=True, use_cache=False)
+            print(np.bincount(validated[0]["kind"]))
+            assert (validated[0] == runs[0][0][0]).all()
+        sys.exit(0)
     if len(opt.log_files) == 0:
         raise ValueError("ERROR: log_file must be specified.")
     print_registered_state()
     #
     pel = []    # Parsed Each Log
-    for f in opt.log_files:
-        pel.append(read_log(f))
+    for f in [_ for x in opt.log_files for _ in list_log_files(x)]:
+        pel.append(read_log(f, opt.validate, opt.use_cache,
+                            opt.ts_absolute))
         print("Start TS:", pel[0]["ts_start"])
         print("  End TS:", pel[0]["ts_end"])
     print_existing_state(pel)
@@ -159,8 +281,8 @@ if __name__ == "__main__":
         for i,b in enumerate(a["states"].keys()):
             if opt.target is not None and opt.target != i:
                 continue
-            x = [_["ts"]+i*opt.alignment for _ in a["states"][b]]
-            y = [find_val(b, _["state"]) for _ in a["states"][b]]
+            x = a["states"][b]["ts"] + i*opt.alignment
+            y = [find_val(b, _) for _ in a["states"][b]["state"]]
             ax.plot(x, y, label=b)
 
         add_line(a["packets"]["rx_id"], 1, "red")
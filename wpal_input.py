@@ -0,0 +1,201 @@
+import os
+import io
+import glob
+import json
+import re
+
+magic_list = [
+    (b"\x1f\x8b", "gz"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zst"),
+    (b"BZh", "bz2"),
+    ]
+
+def compression_of(log_file):
+    """
+    returns the name of the compression detected from the magic bytes,
+    or None for a plain file.
+    """
+    with open(log_file, "rb") as fd:
+        head = fd.read(8)
+    for magic,name in magic_list:
+        if head.startswith(magic):
+            return name
+    return None
+
+def open_log(log_file):
+    """
+    returns a text stream of the file.
+    a compressed file is decompressed on the fly.
+    """
+    kind = compression_of(log_file)
+    if kind is None:
+        return open(log_file, errors="replace")
+    elif kind == "gz":
+        import gzip
+        return gzip.open(log_file, "rt", errors="replace")
+    elif kind == "xz":
+        import lzma
+        return lzma.open(log_file, "rt", errors="replace")
+    elif kind == "bz2":
+        import bz2
+        return bz2.open(log_file, "rt", errors="replace")
+    elif kind == "zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError(f"ERROR: zstandard is required to read {log_file}")
+        reader = zstandard.ZstdDecompressor().stream_reader(
+                open(log_file, "rb"), closefd=True)
+        return io.TextIOWrapper(reader, errors="replace")
+
+# the files written next to the logs, i.e. the event cache of wpal_graph,
+# the index of wpal_oui, and the files being written.
+aux_suffixes = (".wpalc", ".wpalo", ".tmp")
+
+def list_log_files(path):
+    """
+    returns the files in the directory in the name order except the
+    auxiliary files, or the path itself if it is not a directory.
+    """
+    if not os.path.isdir(path):
+        return [path]
+    return [os.path.join(path, _) for _ in sorted(os.listdir(path))
+            if os.path.isfile(os.path.join(path, _)) and
+            not _.endswith(aux_suffixes)]
+
+def iter_log_lines(path):
+    """
+    yield each line of the file, or of the files in the directory.
+    """
+    for log_file in list_log_files(path):
+        with open_log(log_file) as fd:
+            yield from fd
+
+def expand_inputs(inputs, each_file=False):
+    """
+    returns the list of the log files from the names, the globs and
+    the directories.
+    each_file: take each file in a directory as a log.  otherwise,
+        the directory is taken as a log and read by iter_log_lines().
+    """
+    log_files = []
+    for x in inputs:
+        names = [x] if x == "-" else sorted(glob.glob(x)) or [x]
+        for name in names:
+            if each_file:
+                log_files.extend(list_log_files(name))
+            else:
+                log_files.append(name)
+    return log_files
+
+def read_records(fd, object_hook=None):
+    """
+    yield each record written by wpal_parse.
+    both the JSON array and NDJSON, i.e. one record per line, are accepted.
+    NDJSON is read incrementally.
+    object_hook: passed to json.loads.
+    """
+    c = fd.read(1)
+    while c and c.isspace():
+        c = fd.read(1)
+    if c == "[":
+        yield from json.loads(c + fd.read(), object_hook=object_hook)
+    elif c:
+        yield json.loads(c + fd.readline(), object_hook=object_hook)
+        for x in fd:
+            if x.strip():
+                yield json.loads(x, object_hook=object_hook)
+
+def is_ie_packet(msg):
+    p = msg.get("packet") if msg.get("type") == "packet" else None
+    return bool(p) and "eid" in p[0]
+
+def ie_digest(packet):
+    """
+    returns the digest of the elements of an IE record in dict.
+    """
+    import hashlib
+    return hashlib.blake2b(
+            "\n".join([f"{_['name']} {_['data']}" for _ in packet]).encode(),
+            digest_size=8).hexdigest()
+
+def resolve_ie_refs(records):
+    """
+    yield the records in dict with the IEs of "ie_ref" restored from
+    the record of the same "ie_hash", i.e. written by wpal_parse --dedup-ie.
+    """
+    blobs = {}
+    for r in records:
+        msg = r.get("msg") or {}
+        if "ie_hash" in msg:
+            blobs[msg["ie_hash"]] = msg["packet"]
+        elif "ie_ref" in msg:
+            r = dict(r, msg={"type": "packet",
+                             "packet": blobs[msg["ie_ref"]]})
+        yield r
+
+def iter_range_lines(log_file, start=0, end=None):
+    """
+    yield each line in the byte range of a plain file as str.
+    start: the offset of the head of a line.
+    """
+    with open(log_file, "rb") as fd:
+        fd.seek(start)
+        pos = start
+        while end is None or pos < end:
+            line = fd.readline()
+            if not line:
+                break
+            pos += len(line)
+            yield line.decode(errors="replace")
+
+re_ts_bytes = re.compile(rb"(\d+\.\d+): ")
+
+def ts_after(fd, pos):
+    """
+    returns the offset and the timestamp of the first line with a timestamp
+    starting at pos or after, or (None, None).
+    """
+    if pos > 0:
+        # resync to the head of the next line.
+        fd.seek(pos - 1)
+        fd.readline()
+    else:
+        fd.seek(0)
+    while True:
+        offset = fd.tell()
+        line = fd.readline()
+        if not line:
+            return None, None
+        if r := re_ts_bytes.match(line):
+            return offset, float(r.group(1))
+
+def bisect_ts(fd, size, pred):
+    """
+    returns the offset of the first line of which the timestamp satisfies
+    pred, assuming the timestamps are in the ascending order.
+    """
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        _, ts = ts_after(fd, mid)
+        if ts is None or pred(ts):
+            hi = mid
+        else:
+            lo = mid + 1
+    offset, _ = ts_after(fd, lo)
+    return size if offset is None else offset
+
+def find_ts_range(log_file, since=None, until=None):
+    """
+    returns the byte range (start, end) of the lines of which the timestamp
+    is in [since, until] by the binary search on the file.
+    """
+    size = os.path.getsize(log_file)
+    with open(log_file, "rb") as fd:
+        start = 0 if since is None else bisect_ts(fd, size,
+                                                  lambda ts: ts >= since)
+        end = size if until is None else bisect_ts(fd, size,
+                                                   lambda ts: ts > until)
+    return start, max(start, end)
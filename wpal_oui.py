@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+
+"""
+the OUI registry of IEEE (MA-L) for the names of the vendors.
+the registry, oui.txt or oui.csv, is read at the first time into a sorted
+array of the OUIs in 24 bits and the names, which is written into the
+index file, <registry>.wpalo, and is memory-mapped from it later as long
+as the size and the mtime of the registry are not changed.
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import mmap
+from array import array
+from bisect import bisect_left
+
+index_magic = b"WPALO1\n"
+
+# 00-50-F2   (hex)		MICROSOFT CORP.
+re_oui_txt = re.compile(r"^([0-9A-Fa-f]{2})-([0-9A-Fa-f]{2})-([0-9A-Fa-f]{2})"
+                        r"\s+\(hex\)\s+(.*)$")
+
+def read_registry(registry_file):
+    """
+    returns a dict of the OUIs in 24 bits to the names.
+    both oui.txt and oui.csv of IEEE are accepted.
+    """
+    ouis = {}
+    with open(registry_file, encoding="utf-8", errors="replace") as fd:
+        head = fd.readline()
+        fd.seek(0)
+        if head.startswith("Registry,"):
+            for row in csv.DictReader(fd):
+                if row.get("Registry") == "MA-L":
+                    ouis.setdefault(int(row["Assignment"], 16),
+                                    row["Organization Name"].strip())
+        else:
+            for line in fd:
+                if r := re_oui_txt.match(line.strip()):
+                    ouis.setdefault(int("".join(r.group(1, 2, 3)), 16),
+                                    r.group(4).strip())
+    return ouis
+
+class OUIRegistry():
+    """
+    keys: the sorted OUIs, a sequence of int.
+    offsets: the offsets of the names in names, one more than keys.
+    names: the names in UTF-8 concatenated.
+    """
+    def __init__(self, keys, offsets, names):
+        self.keys = keys
+        self.offsets = offsets
+        self.names = names
+
+    @classmethod
+    def from_dict(cls, ouis):
+        keys = array("I", sorted(ouis))
+        offsets = array("I", [0])
+        names = bytearray()
+        for k in keys:
+            names += ouis[k].encode()
+            offsets.append(len(names))
+        return cls(keys, offsets, bytes(names))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, oui):
+        """
+        returns the name of the OUI in 24 bits, or None.
+        """
+        i = bisect_left(self.keys, oui)
+        if i < len(self.keys) and self.keys[i] == oui:
+            return bytes(self.names[self.offsets[i]:self.offsets[i+1]]
+                         ).decode(errors="replace")
+        return None
+
+def write_index(index_file, reg, source):
+    """
+    the index file consists of the magic, a line of the meta data in JSON,
+    and the arrays of the keys and the offsets, and the names, aligned to
+    16 bytes.
+    """
+    meta = {"count": len(reg), "byteorder": sys.byteorder,
+            "itemsize": reg.keys.itemsize, "source": source}
+    header = json.dumps(meta).encode()
+    pad = -(len(index_magic) + len(header) + 1) % 16
+    tmp = f"{index_file}.tmp"
+    with open(tmp, "wb") as fd:
+        fd.write(index_magic)
+        fd.write(header + b" "*pad + b"\n")
+        fd.write(reg.keys.tobytes())
+        fd.write(reg.offsets.tobytes())
+        fd.write(reg.names)
+    os.replace(tmp, index_file)
+
+def read_index(index_file, source):
+    """
+    returns the registry memory-mapped from the index file,
+    or None if the index is not available for the source.
+    """
+    try:
+        with open(index_file, "rb") as fd:
+            if fd.readline() != index_magic:
+                return None
+            meta = json.loads(fd.readline())
+            offset = fd.tell()
+            if (meta.get("source") != source or
+                    meta["byteorder"] != sys.byteorder or
+                    meta["itemsize"] != array("I").itemsize):
+                return None
+            if meta["count"] == 0:
+                return OUIRegistry([], [0], b"")
+            mm = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, KeyError):
+        return None
+    n = meta["count"]
+    size = meta["itemsize"]
+    view = memoryview(mm)
+    keys = view[offset:offset+n*size].cast("I")
+    offset += n*size
+    offsets = view[offset:offset+(n+1)*size].cast("I")
+    offset += (n+1)*size
+    return OUIRegistry(keys, offsets, view[offset:])
+
+def load_registry(registry_file, use_index=True):
+    """
+    returns the OUIRegistry of the registry file.
+    """
+    st = os.stat(registry_file)
+    source = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    index_file = f"{registry_file}.wpalo"
+    if use_index:
+        reg = read_index(index_file, source)
+        if reg is not None:
+            return reg
+    reg = OUIRegistry.from_dict(read_registry(registry_file))
+    if use_index:
+        try:
+            write_index(index_file, reg, source)
+        except OSError as e:
+            print("WARNING: the OUI index was not written.", e,
+                  file=sys.stderr)
+    return reg
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("registry_file", help="specify oui.txt or oui.csv.")
+    ap.add_argument("oui", nargs="*",
+                    help="specify OUIs to look up, e.g. 00:50:f2.")
+    ap.add_argument("--no-index", action="store_false", dest="use_index",
+                    help="disable to read and write the index file.")
+    opt = ap.parse_args()
+    reg = load_registry(opt.registry_file, opt.use_index)
+    print(f"{len(reg)} OUIs")
+    for x in opt.oui:
+        v = int(re.sub("[^0-9A-Fa-f]", "", x), 16)
+        print(f"{v:06x}", reg.lookup(v))
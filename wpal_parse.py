@@ -1,53 +1,164 @@
 #!/usr/bin/env python
 
-from packet import Packet
+from packet import Packet, new_model
 from parse_eap import parse_eapol_hexdump
-from parse_ieee80211ie import parse_ieee80211ie_hexdump
+from parse_ieee80211ie import parse_ieee80211ie_hexdump, \
+        select_ieee80211ie_hexdump
 from pydantic import BaseModel
 from typing import Literal, Union
 import re
+import json
+import os
 
 class State(BaseModel):
     type: str
     state: str
 
+class Assoc(State):
+    ssid: str
+    freq: int
+
 class Message(BaseModel):
     text: str
 
 class Line(BaseModel):
     ts: float
-    msg: Union[Packet, Message, State]
+    msg: Union[Packet, Message, Assoc, State]
 
-re_ts = re.compile("^([\d\.]+): (.*)")
+re_ts_base = re.compile("^([\d\.]+): (.*)")
+re_ts = re_ts_base
 
 def reh_eapol_pae_state(ts, keys, verbosity=0):
-    return State(type="EAPOL_PAE", state=keys(1))
+    return new_model(State, type="EAPOL_PAE", state=keys(1))
 def reh_eapol_be_state(ts, keys, verbosity=0):
-    return State(type="EAPOL_BE", state=keys(1))
+    return new_model(State, type="EAPOL_BE", state=keys(1))
 def reh_eap_state(ts, keys, verbosity=0):
-    return State(type="EAP", state=keys(1))
+    return new_model(State, type="EAP", state=keys(1))
 def reh_if_assoc(ts, keys, verbosity=0):
-    return State(type="BSSID", state=keys(2))
+    return new_model(Assoc, type="BSSID", state=keys(2), ssid=keys(3),
+                     freq=int(keys(4)))
 def reh_if_state(ts, keys, verbosity=0):
-    return State(type="I/F", state=keys(3))
+    return new_model(State, type="I/F", state=keys(3))
 
 re_hdls = [
     { "regex": re.compile("(RX|TX) EAPOL - hexdump\(len=(\d+)\): ([a-f\d\s]+)"),
+     "marker": b"hexdump(",
+     "type": "eapol",
      "hdl": parse_eapol_hexdump },
     { "regex": re.compile("EAPOL: SUPP_PAE entering state (.+)"),
+     "marker": b"entering state",
+     "type": "state",
      "hdl": reh_eapol_pae_state },
     { "regex": re.compile("EAPOL: SUPP_BE entering state (.+)"),
+     "marker": b"entering state",
+     "type": "state",
      "hdl": reh_eapol_be_state },
     { "regex": re.compile("EAP: EAP entering state (.+)"),
+     "marker": b"entering state",
+     "type": "state",
      "hdl": reh_eap_state },
-    { "regex": re.compile("([^:]+): Trying to associate with ([^\s]+) \(SSID='([^']+)' freq="),
+    { "regex": re.compile("([^:]+): Trying to associate with ([^\s]+) \(SSID='([^']+)' freq=(\d+)"),
+     "marker": b"Trying to associate",
+     "type": "state",
      "hdl": reh_if_assoc },
     { "regex": re.compile("([^:]+): State: ([^\s]+) -> ([^\s]+)"),
+     "marker": b"State:",
+     "type": "state",
      "hdl": reh_if_state },
     { "regex": re.compile("IEs - hexdump\(len=(\d+)\): ([a-f\d\s]+)"),
+     "marker": b"hexdump(",
+     "type": "ie",
      "hdl": parse_ieee80211ie_hexdump }
     ]
 
+def compile_dispatch(hdls):
+    """
+    combine the regexes of the handlers into a single alternation so that
+    a line is tested only once.  each alternative is wrapped with a named
+    group, "h<index>", and the group of the alternative that matched is
+    given by lastgroup.
+    returns the compiled regex and a map from the group name to
+    (handler, the group index of the alternative).
+    """
+    rx = re.compile("|".join([f"(?P<h{i}>{h['regex'].pattern})"
+                              for i,h in enumerate(hdls)]))
+    hmap = {f"h{i}": (h, rx.groupindex[f"h{i}"]) for i,h in enumerate(hdls)}
+    return rx, hmap
+
+def compile_marker(hdls):
+    """
+    returns a bytes regex to find any of the markers of the handlers.
+    """
+    markers = sorted(set([h["marker"] for h in hdls]))
+    return re.compile(b"|".join([re.escape(m) for m in markers]))
+
+record_types = [ "eapol", "state", "ie" ]
+
+# the names or the IDs of the elements to be decoded in the IEs through
+# the lazy index, e.g. for --bss, or None to decode all the elements.
+ie_select = None
+
+def select_handlers(only=None, exclude=None):
+    """
+    returns the handlers of the record types.
+    only, exclude: the lists of the record types in record_types.
+    """
+    for t in (only or []) + (exclude or []):
+        if t not in record_types:
+            raise ValueError(f"ERROR: unknown record type {t}")
+    hdls = [h for h in re_hdls
+            if (not only or h["type"] in only) and
+            (not exclude or h["type"] not in exclude)]
+    if ie_select is not None:
+        hdls = [dict(h, hdl=select_ieee80211ie_hexdump(*ie_select))
+                if h["type"] == "ie" else h for h in hdls]
+    return hdls
+
+def setup_parser(hdls=None, stats=None):
+    """
+    build the dispatch and the prefilter from the handlers.
+    hdls: the handlers to be used.  all of re_hdls by default.
+    stats: a wpal_stats.Stats to count the lines, the matches and the time
+        of each handler.  nothing is instrumented without it.
+    """
+    global re_ts, re_dispatch, re_dispatch_map, re_marker
+    if hdls is None:
+        hdls = re_hdls
+    if not hdls:
+        raise ValueError("ERROR: no handler is selected.")
+    re_marker = compile_marker(hdls)
+    if stats:
+        hdls = stats.wrap_handlers(hdls)
+    re_dispatch, re_dispatch_map = compile_dispatch(hdls)
+    re_ts = re_ts_base
+    if stats:
+        re_ts = stats.wrap_ts(re_ts_base)
+        re_dispatch = stats.wrap_dispatch(re_dispatch, re_dispatch_map)
+
+setup_parser()
+
+def iter_marked_lines(mm, start=0, end=None):
+    """
+    mm: a bytes-like object of the log, e.g. mmap.
+    start: the offset of the head of a line.
+    yields the lines in mm[start:end] containing any of the markers as str.
+    the other lines are never decoded.
+    """
+    if end is None:
+        end = len(mm)
+    pos = start
+    while pos < end:
+        r = re_marker.search(mm, pos, end)
+        if not r:
+            break
+        head = mm.rfind(b"\n", pos, r.start())
+        head = pos if head < 0 else head + 1
+        tail = mm.find(b"\n", r.end())
+        if tail < 0:
+            tail = len(mm)
+        yield mm[head:tail].decode(errors="replace")
+        pos = tail + 1
+
 def parse_wpasup_log_line(line, verbosity=0) -> dict:
     r_ts = re_ts.match(line)
     if r_ts:
@@ -55,13 +166,13 @@ def parse_wpasup_log_line(line, verbosity=0) -> dict:
         msg = r_ts.group(2)
         if verbosity > 1:
             print("##", ts, msg)
-        for h in re_hdls:
-            r = h["regex"].match(msg)
-            if r:
-                parsed = h["hdl"](ts, r.group)
-                if verbosity > 1:
-                    print(parsed)
-                return Line(ts=ts, msg=parsed)
+        r = re_dispatch.match(msg)
+        if r:
+            h, base = re_dispatch_map[r.lastgroup]
+            parsed = h["hdl"](ts, lambda n=0: r.group(base + n))
+            if verbosity > 1:
+                print(parsed)
+            return new_model(Line, ts=float(ts), msg=parsed)
         else:
             """
             dir = "NA"
@@ -71,18 +182,403 @@ def parse_wpasup_log_line(line, verbosity=0) -> dict:
     else:
         return None
 
+def parse_wpasup_log(fd, verbosity=0):
+    """
+    fd: an iterable of the log lines.
+    yields Line for each line parsed.
+    """
+    for line in fd:
+        ret = parse_wpasup_log_line(line, verbosity)
+        if ret and len(ret.msg.dict()):
+            yield ret
+
+def open_mmap(log_file):
+    """
+    returns a read-only mmap of the file, or b"" if the file is empty.
+    """
+    import mmap
+    with open(log_file, "rb") as fd:
+        if os.fstat(fd.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+
+def parse_wpasup_log_mmap(log_file, verbosity=0, start=0, end=None):
+    """
+    parse the file, or the byte range of it, through the byte-level
+    prefilter.
+    """
+    yield from parse_wpasup_log(
+            iter_marked_lines(open_mmap(log_file), start, end), verbosity)
+
+def split_log_file(log_file, nb_chunks, start=0, end=None):
+    """
+    split the file, or the byte range [start, end) of it, into byte ranges,
+    each of which starts at the head of a line.
+    returns a list of (start, end).
+    """
+    size = os.path.getsize(log_file) if end is None else end
+    step = max(1, (size - start) // max(1, nb_chunks))
+    bounds = [start]
+    with open(log_file, "rb") as fd:
+        for i in range(1, nb_chunks):
+            fd.seek(max(start + i*step, bounds[-1]))
+            fd.readline()
+            pos = fd.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+worker_stats = None
+
+# the OUI registry given by --oui, for the workers to load it too.
+oui_file = None
+
+def setup_oui_registry(registry_file):
+    """
+    name the vendors of the vendor specific elements by the registry.
+    """
+    global oui_file
+    import parse_ieee80211ie
+    from wpal_oui import load_registry
+    parse_ieee80211ie.set_oui_registry(load_registry(registry_file))
+    oui_file = registry_file
+
+def init_worker(hdl_types, use_stats, validate=False, registry_file=None,
+                elements=None):
+    """
+    hdl_types: the record types of the handlers used in the main process.
+    registry_file: the OUI registry used in the main process.
+    elements: ie_select of the main process.
+    """
+    global worker_stats, ie_select
+    ie_select = elements
+    import packet
+    packet.validate_models = validate
+    if registry_file:
+        setup_oui_registry(registry_file)
+    if use_stats:
+        from wpal_stats import Stats
+        worker_stats = Stats()
+    setup_parser(select_handlers(only=hdl_types), worker_stats)
+
+def parse_log_range(args):
+    """
+    args: (log_file, start, end, verbosity, prefilter)
+    parse the lines in the byte range.
+    returns a list of Line, and the counters of the worker or None.
+    """
+    log_file, start, end, verbosity, prefilter = args
+    if prefilter:
+        lines = list(parse_wpasup_log(
+                iter_marked_lines(open_mmap(log_file), start, end),
+                verbosity))
+    else:
+        from wpal_input import iter_range_lines
+        lines = list(parse_wpasup_log(iter_range_lines(log_file, start, end),
+                                      verbosity))
+    return lines, worker_stats.pop() if worker_stats else None
+
+# the bytes of the log parsed by a task of the pool.
+chunk_size = 8<<20
+
+def parse_wpasup_log_parallel(log_file, nb_jobs, verbosity=0,
+                              prefilter=False, stats=None, start=0, end=None):
+    """
+    parse the file in a process pool.
+    the file is split into the ranges of chunk_size, at least 4 for each
+    worker so that the results can be streamed out while the rest is
+    parsed.  only nb_jobs*2 ranges are in flight, so the results waiting
+    to be written do not grow with the file.  the ranges are returned in
+    the file order, which is the timestamp order of the log.
+    stats: a wpal_stats.Stats to merge the counters of the workers into.
+    start, end: the byte range of the file to be parsed.
+    """
+    from multiprocessing import Pool
+    from collections import deque
+    size = (os.path.getsize(log_file) if end is None else end) - start
+    chunks = iter(split_log_file(log_file,
+                                 max(nb_jobs*4, -(-size // chunk_size)),
+                                 start, end))
+    import packet
+    hdl_types = [h["type"] for (h,_) in re_dispatch_map.values()]
+    with Pool(nb_jobs, initializer=init_worker,
+              initargs=(hdl_types, stats is not None,
+                        packet.validate_models, oui_file,
+                        ie_select)) as pool:
+        def submit():
+            x = next(chunks, None)
+            if x is not None:
+                pending.append(pool.apply_async(
+                        parse_log_range,
+                        ((log_file, *x, verbosity, prefilter),)))
+        pending = deque()
+        for _ in range(nb_jobs*2):
+            submit()
+        while pending:
+            lines,counters = pending.popleft().get()
+            submit()
+            if counters:
+                stats.merge(counters)
+            yield from lines
+
+def iter_log_file(log_file, since=None, until=None):
+    """
+    yield the lines of the log.  if the log is a plain file, the lines
+    out of [since, until] are skipped by the binary search on the file.
+    """
+    from wpal_input import iter_log_lines, iter_range_lines, \
+            compression_of, find_ts_range
+    if ((since is not None or until is not None) and
+        os.path.isfile(log_file) and compression_of(log_file) is None):
+        yield from iter_range_lines(log_file,
+                                    *find_ts_range(log_file, since, until))
+    else:
+        yield from iter_log_lines(log_file)
+
+def filter_ts(lines, since=None, until=None):
+    """
+    pass the records of which the timestamp is in [since, until].
+    """
+    for ret in lines:
+        ts = ret["ts"] if isinstance(ret, dict) else ret.ts
+        if since is not None and ts < since:
+            continue
+        if until is not None and ts > until:
+            continue
+        yield ret
+
+def parse_input_worker(log_file, queue, worker_args, verbosity=0,
+                       since=None, until=None, batch_size=1000):
+    """
+    parse a log in a process and put the records into the queue in batches.
+    the messages are ("lines", a list of the records in dict),
+    ("end", the counters or None), or ("error", the message).
+    worker_args: the arguments of init_worker().
+    """
+    try:
+        init_worker(*worker_args)
+        batch = []
+        for ret in parse_wpasup_log(iter_log_file(log_file, since, until),
+                                    verbosity):
+            x = ret.dict()
+            x["source"] = log_file
+            batch.append(x)
+            if len(batch) >= batch_size:
+                queue.put(("lines", batch))
+                batch = []
+        if batch:
+            queue.put(("lines", batch))
+        queue.put(("end", worker_stats.pop() if worker_stats else None))
+    except Exception as e:
+        queue.put(("error", f"{log_file}: {e!r}"))
+
+def iter_queue(queue, stats=None):
+    while True:
+        kind, x = queue.get()
+        if kind == "lines":
+            yield from x
+        elif kind == "end":
+            if x and stats:
+                stats.merge(x)
+            return
+        else:
+            raise ValueError(f"ERROR: {x}")
+
+def parse_wpasup_log_merged(log_files, verbosity=0, stats=None,
+                            since=None, until=None):
+    """
+    parse each log in its own process, and merge the records lazily in
+    the order of the timestamp.
+    each record is a dict with "source", the name of the log.
+    """
+    import heapq
+    import packet
+    from multiprocessing import Process, Queue
+    hdl_types = [h["type"] for (h,_) in re_dispatch_map.values()]
+    worker_args = (hdl_types, stats is not None, packet.validate_models,
+                   oui_file, ie_select)
+    workers = []
+    streams = []
+    for log_file in log_files:
+        # bounded so that a fast worker does not fill the memory.
+        queue = Queue(maxsize=4)
+        p = Process(target=parse_input_worker,
+                    args=(log_file, queue, worker_args, verbosity,
+                          since, until),
+                    daemon=True)
+        p.start()
+        workers.append(p)
+        streams.append(iter_queue(queue, stats))
+    yield from heapq.merge(*streams, key=lambda x: x["ts"])
+    for p in workers:
+        p.join()
+
+def record_dict(ret):
+    return ret if isinstance(ret, dict) else ret.dict()
+
+def dedup_ie(records, max_blobs=4096):
+    """
+    write the elements of the same IEs only once.
+    the record of a new blob gets "ie_hash", the digest of the elements,
+    and the later records of the blob get "ie_ref" of the digest instead
+    of the elements.  only max_blobs of the blobs recently seen are kept,
+    and a blob forgotten is written again with "ie_hash".
+    wpal_input.resolve_ie_refs() restores the records.
+    """
+    from collections import OrderedDict
+    from wpal_input import is_ie_packet, ie_digest
+    seen = OrderedDict()
+    for r in records:
+        msg = r.get("msg")
+        if msg is not None and is_ie_packet(msg):
+            digest = ie_digest(msg["packet"])
+            if digest in seen:
+                seen.move_to_end(digest)
+                r = dict(r, msg={"type": "packet", "ie_ref": digest,
+                                 "packet": []})
+            else:
+                seen[digest] = True
+                if len(seen) > max_blobs:
+                    seen.popitem(last=False)
+                r = dict(r, msg=dict(msg, ie_hash=digest))
+        yield r
+
+def apply_stages(lines, tls=False, bss=False, sessions=False, dedup=False):
+    """
+    pass the records through the stages after the parser in order.
+    each stage yields the records in dict of {"ts", "msg"}.
+    """
+    if tls:
+        from wpal_tls import reassemble
+        lines = reassemble(record_dict(_) for _ in lines)
+    if bss:
+        from wpal_bss import track_bss
+        lines = track_bss(record_dict(_) for _ in lines)
+    if sessions:
+        from wpal_session import sessionize
+        lines = sessionize(record_dict(_) for _ in lines)
+    if dedup:
+        lines = dedup_ie(record_dict(_) for _ in lines)
+    return lines
+
+def write_json(lines, fd_out):
+    obj = [record_dict(ret) for ret in lines]
+    if obj:
+        json.dump(obj, fd_out, indent=4)
+
+def write_ndjson(lines, fd_out):
+    """
+    write one compact JSON record per line as soon as it is parsed.
+    """
+    for ret in lines:
+        fd_out.write(json.dumps(record_dict(ret), separators=(",",":")))
+        fd_out.write("\n")
+
+def parse_time(s):
+    """
+    returns the epoch of the string, either in epoch or in ISO format.
+    """
+    try:
+        return float(s)
+    except ValueError:
+        from datetime import datetime
+        return datetime.fromisoformat(s).timestamp()
+
 if __name__ == "__main__":
     import argparse
     import sys
-    import json
     ap = argparse.ArgumentParser()
-    ap.add_argument("-f", action="store", dest="log_file")
+    ap.add_argument("-f", action="append", dest="log_files",
+                    help="specify a log file, a glob or a directory. "
+                    "can use in multiple times to merge the logs.")
+    ap.add_argument("-M", action="store_true", dest="merge",
+                    help="parse each file in its own process and merge "
+                    "the records by the timestamp with the source name. "
+                    "a directory is taken as a set of the logs.")
     ap.add_argument("-o", action="store", dest="output_file")
+    ap.add_argument("--ndjson", action="store_true", dest="ndjson",
+                    help="write one JSON record per line while parsing.")
+    ap.add_argument("-j", action="store", dest="nb_jobs", type=int, default=1,
+                    help="specify the number of processes to parse the file.")
+    ap.add_argument("-m", action="store_true", dest="prefilter",
+                    help="map the file into memory and decode only the lines "
+                    "having the markers of the handlers.")
+    ap.add_argument("-F", action="store_true", dest="follow",
+                    help="keep parsing the growing log file like tail -F. "
+                    "the output is NDJSON.")
+    ap.add_argument("--checkpoint", action="store", dest="checkpoint",
+                    help="specify a file to save the position in the log "
+                    "file to resume the follow mode from.")
+    ap.add_argument("--validate", action="store_true", dest="validate",
+                    help="validate every model at construction.")
+    ap.add_argument("--cache", action="store", dest="cache_dir",
+                    help="specify a directory to cache the results.  the "
+                    "result of an unchanged log is taken from the cache.")
+    ap.add_argument("--cache-size", action="store", dest="cache_size",
+                    type=int, default=1024,
+                    help="specify the maximum size of the cache in MB.")
+    ap.add_argument("--cache-hash", action="store_true", dest="cache_hash",
+                    help="identify the log by the digest of the content "
+                    "instead of the inode, the size and the mtime.")
+    ap.add_argument("--only", action="store", dest="only",
+                    type=lambda x: x.split(","),
+                    help="specify the record types to be parsed, "
+                    f"separated by comma. {record_types}")
+    ap.add_argument("--exclude", action="store", dest="exclude",
+                    type=lambda x: x.split(","),
+                    help="specify the record types not to be parsed.")
+    ap.add_argument("--since", action="store", dest="since", type=parse_time,
+                    help="specify the time to start parsing from, in epoch "
+                    "or in ISO format, e.g. 2023-01-08T17:46:13.")
+    ap.add_argument("--until", action="store", dest="until", type=parse_time,
+                    help="specify the time to stop parsing at.")
+    ap.add_argument("--oui", action="store", dest="oui_file",
+                    help="specify the OUI registry of IEEE, oui.txt or "
+                    "oui.csv, to name the vendors.")
+    ap.add_argument("--dedup-ie", action="store_true", dest="dedup_ie",
+                    help="write the same IEs only once and refer to them "
+                    "by the digest later.")
+    # the records are replaced by the output of --bss and --sessions,
+    # which would drop the records of the others.
+    stage = ap.add_mutually_exclusive_group()
+    stage.add_argument("--tls", action="store_true", dest="tls",
+                       help="reassemble the fragments of EAP-TLS/TTLS/PEAP "
+                       "and add a record of the TLS records in each message.")
+    stage.add_argument("--bss", action="store_true", dest="bss",
+                       help="output the events of the BSSs found or changed "
+                       "in the IE dumps instead of the records.")
+    stage.add_argument("--sessions", action="store_true", dest="sessions",
+                       help="write a summary of each connection attempt "
+                       "instead of the records.")
+    ap.add_argument("--stats", action="store_true", dest="stats",
+                    help="print the counters and the time of each handler "
+                    "to stderr at exit.")
+    ap.add_argument("--stats-file", action="store", dest="stats_file",
+                    help="specify a file to write the counters in JSON.")
     ap.add_argument("-v", action="append_const", default=[], const=1,
                     dest="_verbosity")
     ap.add_argument("--test", action="store_true", dest="test")
     opt = ap.parse_args()
     verbosity = len(opt._verbosity)
+    if opt.validate:
+        import packet
+        packet.validate_models = True
+    stats = None
+    if opt.stats or opt.stats_file:
+        from wpal_stats import Stats
+        stats = Stats()
+    if opt.bss:
+        # only the states and the elements of the BSS are decoded.
+        from wpal_bss import bss_elements
+        ie_select = bss_elements
+        if not opt.only:
+            opt.exclude = sorted(set((opt.exclude or []) + ["eapol"]))
+    setup_parser(select_handlers(opt.only, opt.exclude), stats)
+    if opt.oui_file:
+        setup_oui_registry(opt.oui_file)
 
     if opt.test:
         testvec = [
@@ -91,28 +587,236 @@ if __name__ == "__main__":
             "1673167573.015379: TX EAPOL - hexdump(len=30): "
             "01 00 00 1a 02 2b 00 1a 01 61 6e 6f 6e 79 6d 6f "
             "75 73 40 6f 64 79 73 73 79 73 2e 6e 65 74",
+            # 4-Way 1/4 with a PMKID KDE.
+            "1673167574.000000: RX EAPOL - hexdump(len=121): "
+            "02 03 00 75 02 00 8a 00 10 00 00 00 00 00 00 00 "
+            "01 aa 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 16 dd 14 00 0f ac 04 00 01 02 03 04 05 06 "
+            "07 08 09 0a 0b 0c 0d 0e 0f",
+            # 4-Way 2/4 with the RSN element.
+            "1673167574.001000: TX EAPOL - hexdump(len=121): "
+            "02 03 00 75 02 01 0a 00 10 00 00 00 00 00 00 00 "
+            "01 bb 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 11 11 11 11 11 11 11 11 11 11 11 11 11 11 11 "
+            "11 00 16 30 14 01 00 00 0f ac 04 01 00 00 0f ac "
+            "04 01 00 00 0f ac 02 8c 00",
+            # 4-Way 3/4, the key data encrypted.
+            "1673167574.002000: RX EAPOL - hexdump(len=123): "
+            "02 03 00 77 02 13 ca 00 10 00 00 00 00 00 00 00 "
+            "02 aa 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 11 11 11 11 11 11 11 11 11 11 11 11 11 11 11 "
+            "11 00 18 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00",
+            # 4-Way 4/4.
+            "1673167574.003000: TX EAPOL - hexdump(len=99): "
+            "02 03 00 5f 02 03 0a 00 10 00 00 00 00 00 00 00 "
+            "02 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 11 11 11 11 11 11 11 11 11 11 11 11 11 11 11 "
+            "11 00 00",
+            # Group 1/2.
+            "1673167574.004000: RX EAPOL - hexdump(len=123): "
+            "02 03 00 77 02 13 82 00 10 00 00 00 00 00 00 00 "
+            "03 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 11 11 11 11 11 11 11 11 11 11 11 11 11 11 11 "
+            "11 00 18 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00",
+            # Group 2/2.
+            "1673167574.005000: TX EAPOL - hexdump(len=99): "
+            "02 03 00 5f 02 03 02 00 10 00 00 00 00 00 00 00 "
+            "03 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 11 11 11 11 11 11 11 11 11 11 11 11 11 11 11 "
+            "11 00 00",
+            # 4-Way 2/4 with the MIC of 24 octets, e.g. Suite B 192.
+            "1673167574.006000: TX EAPOL - hexdump(len=129): "
+            "02 03 00 7d 02 01 08 00 10 00 00 00 00 00 00 00 "
+            "01 bb 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 11 11 11 11 11 11 11 11 11 11 11 11 11 11 11 "
+            "11 11 11 11 11 11 11 11 11 00 16 30 14 01 00 00 "
+            "0f ac 04 01 00 00 0f ac 04 01 00 00 0f ac 02 8c "
+            "00",
+            # the same with the padding after the frame.
+            "1673167574.007000: TX EAPOL - hexdump(len=133): "
+            "02 03 00 7d 02 01 08 00 10 00 00 00 00 00 00 00 "
+            "01 bb 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 11 11 11 11 11 11 11 11 11 11 11 11 11 11 11 "
+            "11 11 11 11 11 11 11 11 11 00 16 30 14 01 00 00 "
+            "0f ac 04 01 00 00 0f ac 04 01 00 00 0f ac 02 8c "
+            "00 00 00 00 00",
+            # RSN with MFP and a PMKID, HT, VHT, HE and EHT.
+            "1673167574.010000: IEs - hexdump(len=187): "
+            "00 07 65 64 75 72 6f 61 6d 03 01 24 30 2a 01 00 "
+            "00 0f ac 04 01 00 00 0f ac 04 01 00 00 0f ac 02 "
+            "cc 00 01 00 00 01 02 03 04 05 06 07 08 09 0a 0b "
+            "0c 0d 0e 0f 00 0f ac 06 2d 1a ef 01 17 ff ff 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 3d 16 24 05 00 00 00 00 00 00 00 00 "
+            "00 00 00 00 00 00 00 00 00 00 00 00 bf 0c b2 59 "
+            "82 0f fa ff 00 00 fa ff 00 00 c0 05 01 2a 00 fc "
+            "ff ff 16 23 05 00 08 12 00 10 0c 20 02 c0 0f 03 "
+            "95 18 00 cc 00 fa ff fa ff ff 07 24 04 00 00 2a "
+            "fc ff ff 0c 6c 00 00 02 00 00 00 00 00 00 00 00 "
+            "ff 09 6a 01 44 44 44 44 03 2a 32",
             ]
         for v in testvec:
             ret = parse_wpasup_log_line(v, verbosity=verbosity)
             print(json.dumps(ret.dict(), indent=4))
+        # each stage writes the records which --dedup-ie can take.
+        from wpal_gen import gen_log
+        log = list(gen_log(5000, seed=1))
+        for stage in [ "tls", "bss", "sessions" ]:
+            x = list(apply_stages(parse_wpasup_log(log), dedup=True,
+                                  **{stage: True}))
+            print(f"## {stage} --dedup-ie: {len(x)} records")
+            assert x and all(["ts" in _ and "msg" in _ for _ in x])
     else:
         # input file
-        if opt.log_file == "-":
+        from wpal_input import iter_log_lines, compression_of, expand_inputs
+        log_files = expand_inputs(opt.log_files or [], opt.merge)
+        merge = opt.merge or len(log_files) > 1
+        opt.log_file = log_files[0] if len(log_files) == 1 else None
+        # -j and -m need random access to a plain file.
+        is_plain = (opt.log_file not in [None, "-"] and
+                    os.path.isfile(opt.log_file) and
+                    compression_of(opt.log_file) is None)
+        if opt.follow:
+            if not opt.log_file or opt.log_file == "-":
+                raise ValueError("ERROR: -F requires a log_file.")
+            fd = None
+        elif merge:
+            if not log_files or "-" in log_files:
+                raise ValueError("ERROR: log files must be specified to merge.")
+            fd = None
+        elif opt.log_file == "-":
             fd = sys.stdin
         elif opt.log_file:
-            fd = open(opt.log_file)
+            fd = iter_log_file(opt.log_file, opt.since, opt.until)
         else:
             raise ValueError("ERROR: log_file must be specified.")
         # output file
         if opt.output_file and opt.output_file != "-":
-            fd_out = open(opt.output_file, "w")
+            # a resumed follow mode appends to the previous output.
+            fd_out = open(opt.output_file,
+                          "a" if opt.follow and opt.checkpoint else "w")
         else:
             fd_out = sys.stdout
+        # result cache
+        key = None
+        if (opt.cache_dir and not opt.follow and not merge and
+            opt.log_file not in [None, "-"]):
+            import wpal_cache
+            import packet
+            import parse_eap
+            import parse_ieee80211ie
+            import ieee802_11_ids
+            import wpal_input
+            import wpal_session
+            import wpal_tls
+            import wpal_oui
+            import wpal_bss
+            from wpal_input import list_log_files
+            key = wpal_cache.cache_key(
+                    wpal_cache.parser_version(
+                            re_hdls, [packet, parse_eap, parse_ieee80211ie,
+                                      ieee802_11_ids, wpal_input, wpal_session,
+                                      wpal_tls, wpal_oui, wpal_bss,
+                                      sys.modules[__name__]]),
+                    [wpal_cache.input_key(_, opt.cache_hash)
+                     for _ in list_log_files(opt.log_file)],
+                    {"ndjson": opt.ndjson,
+                     "sessions": opt.sessions,
+                     "bss": opt.bss,
+                     "tls": opt.tls,
+                     "dedup_ie": opt.dedup_ie,
+                     "oui": opt.oui_file and
+                            wpal_cache.input_key(opt.oui_file),
+                     "since": opt.since,
+                     "until": opt.until,
+                     "types": sorted(set([h["type"] for h,_ in
+                                          re_dispatch_map.values()]))})
+            if cached := wpal_cache.cache_get(opt.cache_dir, key):
+                import shutil
+                with open(cached) as fd_cache:
+                    shutil.copyfileobj(fd_cache, fd_out)
+                if stats:
+                    # nothing is parsed to be counted.
+                    print(f"## STATS the result is taken from the cache "
+                          f"{cached}", file=sys.stderr)
+                    if opt.stats_file:
+                        with open(opt.stats_file, "w") as fd_stats:
+                            json.dump({"cache": cached}, fd_stats, indent=4)
+                sys.exit(0)
+            fd_out = wpal_cache.CacheWriter(opt.cache_dir, key, fd_out,
+                                            opt.cache_size*1024*1024)
+        # the byte range of a plain file in [since, until].
+        start, end = 0, None
+        if is_plain and (opt.since is not None or opt.until is not None):
+            from wpal_input import find_ts_range
+            start, end = find_ts_range(opt.log_file, opt.since, opt.until)
         # parsing
-        obj = []
-        for line in fd:
-            ret = parse_wpasup_log_line(line, verbosity)
-            if ret and len(ret.msg.dict()):
-                obj.append(ret.dict())
-        if obj:
-            json.dump(obj, fd_out, indent=4)
+        if opt.follow:
+            from wpal_follow import follow_log
+            lines = parse_wpasup_log(follow_log(opt.log_file, opt.checkpoint,
+                                                on_idle=fd_out.flush),
+                                     verbosity)
+        elif merge:
+            lines = parse_wpasup_log_merged(log_files, verbosity, stats,
+                                            opt.since, opt.until)
+        elif opt.nb_jobs > 1 and is_plain:
+            lines = parse_wpasup_log_parallel(opt.log_file, opt.nb_jobs,
+                                              verbosity, opt.prefilter, stats,
+                                              start, end)
+        elif opt.prefilter and is_plain:
+            lines = parse_wpasup_log_mmap(opt.log_file, verbosity, start, end)
+        else:
+            lines = parse_wpasup_log(fd, verbosity)
+        if opt.since is not None or opt.until is not None:
+            lines = filter_ts(lines, opt.since, opt.until)
+        lines = apply_stages(lines, opt.tls, opt.bss, opt.sessions,
+                             opt.dedup_ie)
+        try:
+            if opt.follow:
+                try:
+                    write_ndjson(lines, fd_out)
+                except KeyboardInterrupt:
+                    pass
+            elif opt.ndjson:
+                write_ndjson(lines, fd_out)
+            else:
+                write_json(lines, fd_out)
+        except BaseException:
+            # a partial result must not be left in the cache.
+            if key:
+                fd_out.abort()
+            raise
+        if key:
+            fd_out.commit()
+        if stats:
+            if opt.stats:
+                stats.print_report()
+            if opt.stats_file:
+                stats.write_report(opt.stats_file)
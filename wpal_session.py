@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+
+"""
+group the records of wpal_parse into connection attempts.
+an attempt starts at "Trying to associate", and ends at the I/F state
+COMPLETED, or fails when the I/F state goes back to DISCONNECTED,
+INACTIVE or SCANNING.  only the attempt in progress is kept for each
+source, so the memory does not grow with the log.
+"""
+
+import sys
+import json
+
+fail_states = [ "DISCONNECTED", "INACTIVE", "SCANNING" ]
+
+# (name, the mark of the start, the marks of the end)
+phase_list = [
+    ("assoc_time", "start", ["ASSOCIATED"]),
+    ("eap_time", "eap_start", ["eap_end"]),
+    ("4way_time", "4WAY_HANDSHAKE", ["GROUP_HANDSHAKE", "COMPLETED"]),
+    ("group_time", "GROUP_HANDSHAKE", ["COMPLETED"]),
+    ("total_time", "start", ["end"]),
+    ]
+
+def new_attempt(source, ts, bssid):
+    return {"source": source, "bssid": bssid, "marks": {"start": ts},
+            "ts_last": ts, "last_state": None, "eap_result": None}
+
+def close_attempt(a, ts, result):
+    """
+    returns the record of the summary of the attempt at the end.
+    """
+    marks = a["marks"]
+    marks.setdefault("end", ts)
+    x = {
+        "type": "attempt",
+        "bssid": a["bssid"],
+        "ts_start": marks["start"],
+        "ts_end": marks["end"],
+        "result": result,
+        "last_state": a["last_state"],
+        "eap_result": a["eap_result"],
+        }
+    for name,start,ends in phase_list:
+        t_end = min([marks[_] for _ in ends if _ in marks], default=None)
+        if start in marks and t_end is not None:
+            x[name] = t_end - marks[start]
+        else:
+            x[name] = None
+    r = {"ts": marks["end"], "msg": x}
+    if a["source"] is not None:
+        r["source"] = a["source"]
+    return r
+
+def is_eap_frame(msg):
+    p = msg.get("packet") or []
+    return (len(p) > 1 and p[0].get("packet_name") == "EAPOL" and
+            p[1].get("packet_name") == "EAP")
+
+def sessionize(records, timeout=None):
+    """
+    records: an iterable of the records in dict.
+    timeout: the seconds to close an attempt not finished as "TIMEOUT".
+    yields the record of the summary of each attempt when it ends.
+    the attempts not finished at the end are yielded as "INCOMPLETE".
+    """
+    attempts = {}
+    for r in records:
+        ts = r["ts"]
+        msg = r["msg"]
+        source = r.get("source")
+        a = attempts.get(source)
+        if a and timeout is not None and ts - a["marks"]["start"] > timeout:
+            yield close_attempt(attempts.pop(source), ts, "TIMEOUT")
+            a = None
+        mtype = msg.get("type")
+        if mtype == "BSSID":
+            if a:
+                # a new attempt before the previous one ends.
+                yield close_attempt(attempts.pop(source), ts, "ABORTED")
+            attempts[source] = new_attempt(source, ts, msg["state"])
+            continue
+        if a is None:
+            continue
+        a["ts_last"] = ts
+        marks = a["marks"]
+        if mtype == "I/F":
+            state = msg["state"]
+            a["last_state"] = state
+            marks.setdefault(state, ts)
+            if state == "COMPLETED":
+                yield close_attempt(attempts.pop(source), ts, "COMPLETED")
+            elif state in fail_states:
+                yield close_attempt(attempts.pop(source), ts, "FAILED")
+        elif mtype in [ "EAPOL_PAE", "EAP" ]:
+            marks.setdefault("eap_start", ts)
+            if msg["state"] in [ "SUCCESS", "AUTHENTICATED" ]:
+                marks.setdefault("eap_end", ts)
+                a["eap_result"] = "SUCCESS"
+            elif msg["state"] in [ "FAILURE", "HELD" ]:
+                marks.setdefault("eap_end", ts)
+                a["eap_result"] = "FAILURE"
+        elif mtype == "packet" and is_eap_frame(msg):
+            marks.setdefault("eap_start", ts)
+    for a in attempts.values():
+        yield close_attempt(a, a["ts_last"], "INCOMPLETE")
+
+class Summary():
+    """
+    the number of the attempts for each result, and the count, the sum,
+    the minimum and the maximum of each phase.
+    """
+    def __init__(self):
+        self.results = {}
+        self.phases = {name: {"count": 0, "sum": 0, "min": None, "max": None}
+                       for name,_,_ in phase_list}
+
+    def add(self, x):
+        self.results[x["result"]] = self.results.get(x["result"], 0) + 1
+        for name,p in self.phases.items():
+            v = x[name]
+            if v is None:
+                continue
+            p["count"] += 1
+            p["sum"] += v
+            p["min"] = v if p["min"] is None else min(p["min"], v)
+            p["max"] = v if p["max"] is None else max(p["max"], v)
+
+    def dict(self):
+        return {
+            "results": self.results,
+            "phases": {name: dict(p, mean=p["sum"]/p["count"] if p["count"]
+                                  else None)
+                       for name,p in self.phases.items()},
+            }
+
+if __name__ == "__main__":
+    import argparse
+    from wpal_input import open_log, read_records
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-f", action="store", dest="log_file",
+                    help="specify the output of wpal_parse.")
+    ap.add_argument("-o", action="store", dest="output_file")
+    ap.add_argument("--timeout", action="store", dest="timeout", type=float,
+                    help="specify the seconds to give up an attempt.")
+    ap.add_argument("--summary", action="store_true", dest="summary",
+                    help="print the summary of all attempts to stderr.")
+    opt = ap.parse_args()
+    if opt.log_file and opt.log_file != "-":
+        fd = open_log(opt.log_file)
+    else:
+        fd = sys.stdin
+    if opt.output_file and opt.output_file != "-":
+        fd_out = open(opt.output_file, "w")
+    else:
+        fd_out = sys.stdout
+    summary = Summary()
+    for x in sessionize(read_records(fd), opt.timeout):
+        summary.add(x["msg"])
+        fd_out.write(json.dumps(x, separators=(",",":")))
+        fd_out.write("\n")
+    if opt.summary:
+        json.dump(summary.dict(), sys.stderr, indent=4)
+        print(file=sys.stderr)
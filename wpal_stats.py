@@ -0,0 +1,166 @@
+import sys
+import json
+from time import perf_counter_ns
+
+class Histogram():
+    """
+    a histogram of durations in ns with the buckets of the power of 2
+    so that it can be merged and takes a constant memory.
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.buckets = [0] * 64
+
+    def add(self, ns):
+        self.count += 1
+        self.total += ns
+        self.buckets[min(ns.bit_length(), 63)] += 1
+
+    def percentile(self, p):
+        """
+        returns the upper bound of the bucket of the p-th percentile in ns.
+        """
+        n = self.count * p / 100
+        acc = 0
+        for i,c in enumerate(self.buckets):
+            acc += c
+            if c and acc >= n:
+                return 1 << i
+        return 0
+
+    def merge(self, d):
+        self.count += d["count"]
+        self.total += d["total"]
+        self.buckets = [a+b for a,b in zip(self.buckets, d["buckets"])]
+
+    def dict(self):
+        return {"count": self.count, "total": self.total,
+                "buckets": self.buckets}
+
+class Stats():
+    """
+    the counters of the parser.
+    wrap_ts(), wrap_dispatch() and wrap_handlers() wrap re_ts, the dispatch
+    regex and the handlers with the counters, which wpal_parse.setup_parser()
+    does only when a Stats is given, so nothing is added to the parser when
+    it is not used.
+    """
+    def __init__(self):
+        self.nb_lines = 0
+        self.nb_ts_rejected = 0
+        self.regex = {}
+        self.hdl = {}
+
+    def wrap_ts(self, regex):
+        stats = self
+        class TimedTs():
+            def match(self, line):
+                stats.nb_lines += 1
+                r = regex.match(line)
+                if r is None:
+                    stats.nb_ts_rejected += 1
+                return r
+        return TimedTs()
+
+    def wrap_dispatch(self, regex, hmap):
+        """
+        the time of the dispatch regex is accounted to the handler matched,
+        or to "(none)".
+        """
+        names = {k: h["hdl"].__name__ for k,(h,_) in hmap.items()}
+        for name in list(names.values()) + ["(none)"]:
+            self.regex.setdefault(name, Histogram())
+        stats = self
+        class TimedDispatch():
+            def match(self, msg):
+                t0 = perf_counter_ns()
+                r = regex.match(msg)
+                t = perf_counter_ns() - t0
+                stats.regex[names[r.lastgroup] if r else "(none)"].add(t)
+                return r
+        return TimedDispatch()
+
+    def wrap_handlers(self, hdls):
+        """
+        returns a copy of the handlers timed.
+        """
+        def timed(hdl):
+            h = self.hdl.setdefault(hdl.__name__, Histogram())
+            def f(*args, **kwargs):
+                t0 = perf_counter_ns()
+                ret = hdl(*args, **kwargs)
+                h.add(perf_counter_ns() - t0)
+                return ret
+            f.__name__ = hdl.__name__
+            return f
+        return [dict(h, hdl=timed(h["hdl"])) for h in hdls]
+
+    def pop(self):
+        """
+        returns the counters as a dict and resets them.
+        """
+        d = self.dict()
+        self.nb_lines = 0
+        self.nb_ts_rejected = 0
+        for x in list(self.regex.values()) + list(self.hdl.values()):
+            x.__init__()
+        return d
+
+    def merge(self, d):
+        self.nb_lines += d["nb_lines"]
+        self.nb_ts_rejected += d["nb_ts_rejected"]
+        for k in ["regex", "hdl"]:
+            for name,v in d[k].items():
+                getattr(self, k).setdefault(name, Histogram()).merge(v)
+
+    def dict(self):
+        return {
+            "nb_lines": self.nb_lines,
+            "nb_ts_rejected": self.nb_ts_rejected,
+            "regex": {k: v.dict() for k,v in self.regex.items()},
+            "hdl": {k: v.dict() for k,v in self.hdl.items()},
+            }
+
+    def report(self):
+        """
+        returns the summary for each handler in a dict.
+        a line is tried by the combined regex of all the handlers at once,
+        so the lines tried are counted only in total, "tried".
+        """
+        handlers = {}
+        for name,h in self.regex.items():
+            x = {
+                "matched": h.count,
+                "regex_total_ms": h.total / 1e6,
+                "regex_p99_us": h.percentile(99) / 1e3,
+                }
+            if name in self.hdl:
+                x.update({
+                    "hdl_total_ms": self.hdl[name].total / 1e6,
+                    "hdl_p99_us": self.hdl[name].percentile(99) / 1e3,
+                    })
+            handlers[name] = x
+        return {
+            "lines": self.nb_lines,
+            "ts_rejected": self.nb_ts_rejected,
+            "tried": self.nb_lines - self.nb_ts_rejected,
+            "handlers": handlers,
+            }
+
+    def print_report(self, fd=sys.stderr):
+        r = self.report()
+        print(f"## STATS lines={r['lines']} "
+              f"ts_rejected={r['ts_rejected']} tried={r['tried']}", file=fd)
+        print(f"{'handler':<28} {'matched':>9} "
+              f"{'regex ms':>9} {'p99 us':>7} {'hdl ms':>9} {'p99 us':>7}",
+              file=fd)
+        for name,x in r["handlers"].items():
+            print(f"{name:<28} {x['matched']:>9} "
+                  f"{x['regex_total_ms']:>9.1f} {x['regex_p99_us']:>7.1f} "
+                  f"{x.get('hdl_total_ms', 0):>9.1f} "
+                  f"{x.get('hdl_p99_us', 0):>7.1f}", file=fd)
+
+    def write_report(self, report_file):
+        with open(report_file, "w") as fd:
+            json.dump(self.report(), fd, indent=4)
@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+
+"""
+reassemble the fragments of EAP-TLS, EAP-TTLS and EAP-PEAP in the records
+of wpal_parse into TLS messages, and list the TLS records in them.
+a message is collected in a buffer for each source and each EAP code,
+i.e. the direction, and is sent as one record when the fragment without
+the M flag comes.  the buffers are limited in size and in time, so a
+broken exchange does not grow the memory.
+"""
+
+import sys
+import json
+import struct
+
+tls_methods = { 13: "EAP-TLS", 21: "EAP-TTLS", 25: "EAP-PEAP" }
+
+# the flags of the methods.  the lower bits are the version for TTLS/PEAP.
+flag_length = 0x80
+flag_more = 0x40
+flag_start = 0x20
+
+content_types = {
+    20: "ChangeCipherSpec",
+    21: "Alert",
+    22: "Handshake",
+    23: "ApplicationData",
+    }
+
+handshake_types = {
+    0: "HelloRequest",
+    1: "ClientHello",
+    2: "ServerHello",
+    4: "NewSessionTicket",
+    8: "EncryptedExtensions",
+    11: "Certificate",
+    12: "ServerKeyExchange",
+    13: "CertificateRequest",
+    14: "ServerHelloDone",
+    15: "CertificateVerify",
+    16: "ClientKeyExchange",
+    20: "Finished",
+    }
+
+tls_record_header = struct.Struct("!BHH")
+tls_message_length = struct.Struct("!I")
+
+def vt(v, vtmap):
+    return {"Value": v, "Text": vtmap.get(v, "UNKNOWN")}
+
+def parse_handshake(data):
+    """
+    returns the list of the handshake messages in the data.
+    data: memoryview of the handshake records concatenated.
+    """
+    msgs = []
+    offset = 0
+    while offset + 4 <= len(data):
+        length = int.from_bytes(data[offset+1:offset+4], "big")
+        x = {"type": vt(data[offset], handshake_types), "length": length}
+        if data[offset] == 11 and offset + 7 <= len(data):
+            # the length of each certificate in the chain.
+            certs = []
+            pos = offset + 7
+            end = min(offset + 4 + length, len(data))
+            while pos + 3 <= end:
+                n = int.from_bytes(data[pos:pos+3], "big")
+                certs.append(n)
+                pos += 3 + n
+            x["certificates"] = certs
+        msgs.append(x)
+        offset += 4 + length
+    return msgs
+
+def parse_tls_records(data):
+    """
+    returns the list of the TLS records in the message.
+    the handshake messages are listed until ChangeCipherSpec, after which
+    they are encrypted.
+    data: memoryview
+    """
+    records = []
+    handshake = bytearray()
+    encrypted = False
+    offset = 0
+    while offset + tls_record_header.size <= len(data):
+        type, version, length = tls_record_header.unpack_from(data, offset)
+        offset += tls_record_header.size
+        x = {"type": vt(type, content_types), "version": f"0x{version:04x}",
+             "length": length}
+        if offset + length > len(data):
+            x["truncated"] = True
+        if type == 22 and not encrypted:
+            handshake += data[offset:offset+length]
+        elif type == 20:
+            encrypted = True
+        records.append(x)
+        offset += length
+    if handshake:
+        msgs = parse_handshake(memoryview(handshake))
+        for x in records:
+            if x["type"]["Value"] == 22 and "handshake" not in x:
+                x["handshake"] = msgs
+                break
+    return records
+
+class Exchange():
+    """
+    the fragments of a TLS message being collected.
+    the buffer is allocated once by the length with the L flag, unless
+    the length is more than max_size.
+    """
+    def __init__(self, ts, method, code, length, max_size):
+        self.ts_start = ts
+        self.method = method
+        self.code = code
+        self.length = length
+        self.max_size = max_size
+        self.size = 0
+        self.nb_fragments = 0
+        self.last_id = None
+        self.error = None
+        if length is not None and length > max_size:
+            self.error = "too large"
+            self.buf = bytearray()
+        else:
+            self.buf = bytearray(length if length is not None else 0)
+
+    def add(self, identifier, frag):
+        """
+        frag: memoryview of the fragment.
+        """
+        if identifier == self.last_id:
+            # a retransmission.
+            return
+        self.last_id = identifier
+        self.nb_fragments += 1
+        if self.error is not None:
+            return
+        end = self.size + len(frag)
+        if end > self.max_size:
+            self.error = "too large"
+            return
+        if self.length is None:
+            self.buf += frag
+        elif end > self.length:
+            self.error = "longer than the length"
+            return
+        else:
+            self.buf[self.size:end] = frag
+        self.size = end
+
+    def record(self, ts, source):
+        x = {
+            "type": "tls",
+            "method": self.method,
+            "code": self.code,
+            "ts_start": self.ts_start,
+            "fragments": self.nb_fragments,
+            "length": self.size,
+            }
+        if self.error is None and self.length not in [ None, self.size ]:
+            self.error = "shorter than the length"
+        if self.error is not None:
+            x["error"] = self.error
+        else:
+            x["records"] = parse_tls_records(memoryview(self.buf)[:self.size])
+        r = {"ts": ts, "msg": x}
+        if source is not None:
+            r["source"] = source
+        return r
+
+def tls_frame(msg):
+    """
+    returns the EAP header in dict and the data in bytes of a frame
+    of the TLS methods, or (None, None).
+    """
+    if msg.get("type") != "packet":
+        return None, None
+    p = msg.get("packet") or []
+    if (len(p) < 2 or p[0].get("packet_name") != "EAPOL" or
+            p[1].get("packet_name") != "EAP"):
+        return None, None
+    eap = p[1]
+    if eap.get("Type") is None or eap["Type"]["Value"] not in tls_methods:
+        return eap, None
+    return eap, bytes.fromhex(eap.get("Data") or "")
+
+def reassemble(records, max_size=1<<20, timeout=30.0):
+    """
+    records: an iterable of the records in dict.
+    max_size: the bytes of a message to give up.
+    timeout: the seconds of an exchange to give up.
+    yields the records as they are, and a "tls" record after the last
+    fragment of each message.
+    """
+    exchanges = {}
+    for r in records:
+        yield r
+        ts = r["ts"]
+        source = r.get("source")
+        for key in [k for k,e in exchanges.items()
+                    if ts - e.ts_start > timeout]:
+            e = exchanges.pop(key)
+            e.error = "timeout"
+            yield e.record(ts, key[0])
+        eap, data = tls_frame(r["msg"])
+        if eap is None:
+            continue
+        if data is None:
+            if eap["Code"]["Value"] in [ 3, 4 ]:
+                # Success or Failure ends the exchanges of the source.
+                for key in [k for k in exchanges if k[0] == source]:
+                    e = exchanges.pop(key)
+                    e.error = "incomplete"
+                    yield e.record(ts, source)
+            continue
+        if not data:
+            continue
+        flags = data[0]
+        frag = memoryview(data)[1:]
+        length = None
+        key = (source, eap["Code"]["Text"])
+        if flags & flag_length:
+            if len(frag) < tls_message_length.size:
+                # the flow is given up, and starts again by the next one.
+                e = exchanges.pop(key, None) or Exchange(
+                        ts, tls_methods[eap["Type"]["Value"]],
+                        eap["Code"]["Text"], None, max_size)
+                e.nb_fragments += 1
+                e.error = "truncated"
+                yield e.record(ts, source)
+                continue
+            length, = tls_message_length.unpack_from(frag)
+            frag = frag[tls_message_length.size:]
+        e = exchanges.get(key)
+        if e is None or flags & flag_start:
+            if not frag and not flags & flag_more:
+                # an ACK or the start without data.
+                continue
+            e = exchanges[key] = Exchange(
+                    ts, tls_methods[eap["Type"]["Value"]],
+                    eap["Code"]["Text"], length, max_size)
+        e.add(eap["Identifier"], frag)
+        if e.error is not None:
+            yield exchanges.pop(key).record(ts, source)
+        elif not flags & flag_more:
+            yield exchanges.pop(key).record(ts, source)
+    for (source,_),e in exchanges.items():
+        e.error = "incomplete"
+        yield e.record(e.ts_start, source)
+
+if __name__ == "__main__":
+    import argparse
+    from wpal_input import open_log, read_records
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-f", action="store", dest="log_file",
+                    help="specify the output of wpal_parse.")
+    ap.add_argument("-o", action="store", dest="output_file")
+    ap.add_argument("--max-size", action="store", dest="max_size", type=int,
+                    default=1<<20,
+                    help="specify the bytes of a TLS message to give up.")
+    ap.add_argument("--timeout", action="store", dest="timeout", type=float,
+                    default=30.0,
+                    help="specify the seconds of an exchange to give up.")
+    ap.add_argument("--only-tls", action="store_true", dest="only_tls",
+                    help="output only the reassembled messages.")
+    ap.add_argument("--test", action="store_true", dest="test")
+    opt = ap.parse_args()
+    if opt.test:
+        from wpal_parse import parse_wpasup_log_line
+        testvec = [
+            # ServerHelloDone with the L flag in a fragment.
+            ("1673167573.015110: RX EAPOL - hexdump(len=23): "
+             "01 00 00 13 01 05 00 13 0d 80 00 00 00 09 "
+             "16 03 03 00 04 0e 00 00 00", None),
+            # the L flag claiming 4 GB must not be allocated.
+            ("1673167573.015210: RX EAPOL - hexdump(len=17): "
+             "01 00 00 0d 01 06 00 0d 0d c0 ff ff ff ff 16 03 01",
+             "too large"),
+            # the L flag without the length.
+            ("1673167573.015310: RX EAPOL - hexdump(len=11): "
+             "01 00 00 07 01 05 00 07 0d 80 00", "truncated"),
+            ]
+        for v,error in testvec:
+            r = parse_wpasup_log_line(v).dict()
+            x = [_ for _ in reassemble([r], opt.max_size, opt.timeout)
+                 if _["msg"]["type"] == "tls"][0]
+            print(json.dumps(x, indent=4))
+            assert x["msg"].get("error") == error
+        sys.exit(0)
+    if opt.log_file and opt.log_file != "-":
+        fd = open_log(opt.log_file)
+    else:
+        fd = sys.stdin
+    if opt.output_file and opt.output_file != "-":
+        fd_out = open(opt.output_file, "w")
+    else:
+        fd_out = sys.stdout
+    for x in reassemble(read_records(fd), opt.max_size, opt.timeout):
+        if opt.only_tls and x["msg"].get("type") != "tls":
+            continue
+        fd_out.write(json.dumps(x, separators=(",",":")))
+        fd_out.write("\n")